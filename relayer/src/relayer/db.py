@@ -1,23 +1,23 @@
 
-from typing import List
+from typing import Dict, Optional
 import uuid
 from attr import dataclass
 import threading
 
-from pydantic import BaseModel
+import msgspec
 
-class OrderData(BaseModel):
+class OrderData(msgspec.Struct):
     salt: str
     src_chain: int
     dst_chain: int
     make_amount: str
     take_amount: str
 
-class Signature(BaseModel):
+class Signature(msgspec.Struct):
     signed_message: str
     signer_address: str
 
-class Order(BaseModel):
+class Order(msgspec.Struct):
     order_data: OrderData
     signature: Signature
 
@@ -36,6 +36,7 @@ class InterstellarOrder:
 class InterstellarDb:
     _instance = None
     _lock = threading.Lock()
+    _initialized = False
 
     def __new__(cls, *args, **kwargs):
         if not cls._instance:
@@ -45,8 +46,10 @@ class InterstellarDb:
         return cls._instance
 
     def __init__(self):
-        if not hasattr(self, "orders"):
-            self.orders: List[InterstellarOrder] = []
+        if self._initialized:
+            return
+        self.orders: Dict[str, InterstellarOrder] = {}
+        self._initialized = True
 
     def create_order(self, order_data: Order) -> InterstellarOrder:
         """Create a new order and add it to the database."""
@@ -62,28 +65,38 @@ class InterstellarDb:
             safety_deposit_amount=100,
             timelocks={}
         )
-        self.orders.append(new_order)
+        self.orders[id] = new_order
         return new_order
 
     def read_order(self, order_id: str) -> InterstellarOrder:
         """Retrieve an order by its ID."""
-        for order in self.orders:
-            if order.order_id == order_id:
-                return order
-        raise ValueError(f"Order with ID {order_id} not found.")
+        try:
+            return self.orders[order_id]
+        except KeyError:
+            raise ValueError(f"Order with ID {order_id} not found.") from None
 
     def update_order(self, order_id: str, new_order_id: str):
         """Update the order ID of an existing order."""
-        for order in self.orders:
-            if order.order_id == order_id:
-                order.order_id = new_order_id
-                return
-        raise ValueError(f"Order with ID {order_id} not found.")
+        try:
+            order = self.orders.pop(order_id)
+        except KeyError:
+            raise ValueError(f"Order with ID {order_id} not found.") from None
+        order.order_id = new_order_id
+        self.orders[new_order_id] = order
 
     def delete_order(self, order_id: str):
         """Delete an order by its ID."""
-        for order in self.orders:
-            if order.order_id == order_id:
-                self.orders.remove(order)
-                return
-        raise ValueError(f"Order with ID {order_id} not found.")
\ No newline at end of file
+        try:
+            del self.orders[order_id]
+        except KeyError:
+            raise ValueError(f"Order with ID {order_id} not found.") from None
+
+
+_DB_SINGLETON: Optional[InterstellarDb] = None
+
+def get_db() -> InterstellarDb:
+    """Return the process-wide InterstellarDb without re-entering the singleton constructor."""
+    global _DB_SINGLETON
+    if _DB_SINGLETON is None:
+        _DB_SINGLETON = InterstellarDb()
+    return _DB_SINGLETON
@@ -1,19 +1,129 @@
-from web3 import Web3
+from hexbytes import HexBytes
+from web3 import AsyncWeb3, WebSocketProvider
+from web3.exceptions import TimeExhausted, Web3RPCError
 from web3.middleware import ExtraDataToPOAMiddleware
-import asyncio, json, logging
+from typing import NamedTuple
+import asyncio, logging
+
+from .evm_utils import _load_abi
+
+HTLC_EVENTS = ("Deposited", "Claimed", "Refunded")
+INITIAL_STRIDE = 2_000
+MIN_STRIDE = 50
+MAX_STRIDE = 10_000
+PREFETCH_BATCHES = 4
+
+class EthereumLogRef(NamedTuple):
+    """Undecoded stand-in for a log, yielded while nothing consumes event payloads."""
+    block: int
+    tx_hash: HexBytes
 
 class EthereumWatcher:
-    def __init__(self, rpc_url: str, abi_path: str, escrow_address: str):
-        self.w3  = Web3(Web3.HTTPProvider(rpc_url, request_kwargs={"timeout": 60}))
+    def __init__(self, ws_url: str, abi_path: str, escrow_address: str,
+                 cursor_path: str = "ethereum_cursor", decode: bool = True):
+        self.w3  = AsyncWeb3(WebSocketProvider(ws_url))
         self.w3.middleware_onion.inject(ExtraDataToPOAMiddleware, layer=0)
-        self.htlc = self.w3.eth.contract(abi=json.load(open(abi_path)),
+        self.htlc = self.w3.eth.contract(abi=_load_abi(abi_path),
                                          address=self.w3.to_checksum_address(escrow_address))
         self.log  = logging.getLogger("EthereumWatcher")
+        self.decode = decode
+        # topic0 -> event, so one OR-ed topic filter covers every HTLC event
+        self.events = {
+            HexBytes(evt.topic): evt
+            for evt in (getattr(self.htlc.events, name)() for name in HTLC_EVENTS
+                        if hasattr(self.htlc.events, name))
+        }
+        # (block, log index) of the last handled log, persisted so a restart resumes where handling
+        # stopped; a block seen only partly is scanned again and its handled logs skipped
+        self.cursor_path = cursor_path
+        self.position = self._load_cursor()
+        # next block to scan
+        self.cursor = self.position[0] if self.position else None
+        self.stride = INITIAL_STRIDE
+
+    def _load_cursor(self):
+        try:
+            with open(self.cursor_path) as f:
+                block, _, index = f.read().strip().partition(":")
+            return (int(block), int(index) if index else -1) if block and int(block) else None
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _write_cursor(self, position: tuple):
+        with open(self.cursor_path, "w") as f:
+            f.write("%d:%d" % position)
+
+    def _log_filter(self) -> dict:
+        return {"address": self.htlc.address, "topics": [list(self.events)]}
+
+    async def _get_logs_adaptive(self, from_block: int, to_block: int):
+        """
+        Yield log batches for [from_block, to_block] in chunks the node can serve:
+        the stride halves whenever a range times out or is rejected and grows
+        again on success, so a long backfill never hits the RPC time budget.
+        """
+        cur = from_block
+        while cur <= to_block:
+            end = min(cur + self.stride - 1, to_block)
+            try:
+                logs = await self.w3.eth.get_logs(self._log_filter() | {"fromBlock": cur, "toBlock": end})
+            except (Web3RPCError, TimeExhausted, ValueError) as err:
+                if self.stride == MIN_STRIDE:
+                    raise
+                self.stride = max(MIN_STRIDE, self.stride // 2)
+                self.log.warning(f"getLogs {cur}-{end} failed ({err}), retrying with stride {self.stride}")
+                continue
+            self.cursor = cur = end + 1
+            self.stride = min(MAX_STRIDE, int(self.stride * 1.25))
+            yield logs
+
+    def _decode(self, log):
+        if not self.decode:
+            return EthereumLogRef(log["blockNumber"], log["transactionHash"])
+        entry = self.events[HexBytes(log["topics"][0])].process_log(log)
+        self.log.info(f"{entry['event']} on Ethereum: {entry['args']}")
+        return {"chain": "eth", "event": entry["event"], "data": dict(entry["args"])}
+
+    async def _fetch_loop(self, queue: asyncio.Queue):
+        """Fetch raw log batches into `queue` ahead of the consumer."""
+        try:
+            # the node pushes matching logs over the socket, no polling in between
+            await self.w3.provider.connect()
+            try:
+                if self.cursor is None:
+                    self.cursor = await self.w3.eth.block_number
+                await self.w3.eth.subscribe("logs", self._log_filter())
+                # catch up on whatever landed before the subscription went live
+                head = await self.w3.eth.block_number
+                async for batch in self._get_logs_adaptive(self.cursor, head):
+                    # a scanned range is complete up to the block before the cursor
+                    await queue.put(((self.cursor, -1), batch))
+                async for payload in self.w3.socket.process_subscriptions():
+                    log = payload["result"]
+                    # more logs of this block may still arrive, it stays the block to rescan
+                    self.cursor = max(self.cursor, log["blockNumber"])
+                    await queue.put(((log["blockNumber"], log["logIndex"]), [log]))
+            finally:
+                await self.w3.provider.disconnect()
+        except Exception as err:
+            await queue.put(err)
 
     async def watch_events(self):
-        event_filter = self.htlc.events.Deposited.create_filter(fromBlock="latest")  # web3.py filters :contentReference[oaicite:1]{index=1}
-        while True:
-            for entry in event_filter.get_new_entries():
-                self.log.info(f"Deposit on Ethereum: {entry['args']}")
-                yield {"chain": "eth", "event": entry["event"], "data": dict(entry["args"])}
-            await asyncio.sleep(2)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=PREFETCH_BATCHES)
+        fetcher = asyncio.create_task(self._fetch_loop(queue))
+        try:
+            while True:
+                item = await queue.get()
+                if isinstance(item, Exception):
+                    raise item
+                position, batch = item
+                for log in batch:
+                    # handled before a restart, or delivered by both the catch-up and the subscription
+                    if self.position is not None and (log["blockNumber"], log["logIndex"]) <= self.position:
+                        continue
+                    yield self._decode(log)
+                # only reached once the consumer is done with the whole batch
+                self.position = max(self.position, position) if self.position else position
+                await asyncio.to_thread(self._write_cursor, self.position)
+        finally:
+            fetcher.cancel()
@@ -1,14 +1,15 @@
 from __future__ import annotations
 from typing import Any, Tuple
-import os, json, random, sys
+import asyncio, functools, itertools, os, random, struct, sys
 from hexbytes import HexBytes
 from dotenv import load_dotenv
 from eth_account import Account
-from web3 import Web3
-import time
+from eth_keys import keys
+from web3 import AsyncWeb3, Web3
+from web3.logs import DISCARD
 from eth_account.signers.local import LocalAccount
 
-from .evm_utils import _send_tx
+from .evm_utils import _load_abi, _send_tx, _send_txs, _start_head_listener
 
 load_dotenv()
 
@@ -16,87 +17,96 @@ load_dotenv()
 HERE = os.path.dirname(os.path.abspath(__file__))
 
 def _abi(name: str):  # very small helper for *.json ABI
-    with open(os.path.join(HERE, f"{name}.json")) as f:
-        return json.load(f)["abi"]
+    return _load_abi(os.path.join(HERE, f"{name}.json"))["abi"]
+
+@functools.lru_cache(maxsize=None)
+def _csum(address: str) -> str:
+    return Web3.to_checksum_address(address)
 
 def _pack_timelocks(t0: int, t1: int, t2: int, t3: int) -> int:
-    return t0 | (t1 << 64) | (t2 << 128) | (t3 << 192)
+    return int.from_bytes(struct.pack(">QQQQ", t3, t2, t1, t0), "big")
 # ─────────────────────────────────────────────────────────────────────
 # ───────────────────────────────────────────────────────────────────── web3 setup
+# one provider (and so one pooled HTTP session) for every call in this module
 RPC_URL             = os.getenv("EVM_RPC", "")
-w3                  = Web3(Web3.HTTPProvider(RPC_URL))
-RESOLVER            = Web3.to_checksum_address(os.getenv("EVM_RESOLVER_ADDRESS", ""))
-RESOLVER_ABI        = _abi("Resolver")
-resolver            = w3.eth.contract(address=RESOLVER, abi=RESOLVER_ABI)
-FACTORY_ADDR        = Web3.to_checksum_address(os.getenv("EVM_ESCROW_FACTORY_ADDRESS", ""))
-FACTORY_ABI         = _abi("EscrowFactory")
-factory             = w3.eth.contract(address=FACTORY_ADDR, abi=FACTORY_ABI)
-LOP_ADDR            = Web3.to_checksum_address(os.getenv("EVM_LOP_ADDRESS", ""))
-LOP_ABI             = _abi("LimitOrderProtocol")
-lop                 = w3.eth.contract(address=LOP_ADDR, abi=LOP_ABI)
+_provider           = AsyncWeb3.AsyncHTTPProvider(RPC_URL, request_kwargs={"timeout": 60})
+w3                  = AsyncWeb3(_provider)
+
+# contracts are bound on first use so a missing address only fails the code that needs it
+@functools.cache
+def _resolver():
+    return w3.eth.contract(address=_csum(os.getenv("EVM_RESOLVER_ADDRESS", "")), abi=_abi("Resolver"))
+
+@functools.cache
+def _factory():
+    return w3.eth.contract(address=_csum(os.getenv("EVM_ESCROW_FACTORY_ADDRESS", "")), abi=_abi("EscrowFactory"))
+
+@functools.cache
+def _lop():
+    return w3.eth.contract(address=_csum(os.getenv("EVM_LOP_ADDRESS", "")), abi=_abi("LimitOrderProtocol"))
 # ────────────────────────────────────────────────────────── on-cain hash
-def _order_hash(order_tuple: Tuple[int, ...]) -> HexBytes:
+async def _prefetch(order_tuple: Tuple[int, ...], acc: LocalAccount) -> Tuple[HexBytes, int, int]:
     """
-    Try the on‑chain helper first (cheapest & always 100 % exact).
-    If it fails (old deployments without `hashOrder`) fall back to local hash.
+    Fetch the on-chain order hash together with the sender's pending nonce and
+    the chain id in a single JSON-RPC batch. A failing call raises its own RPC
+    error (a revert from hashOrder, a nonce or transport error otherwise).
     """
-    try:
-        return HexBytes(lop.functions.hashOrder(order_tuple).call())
-    except Exception:
-        raise Exception("Failed to call hashOrder on LOP")
+    async with w3.batch_requests() as batch:
+        batch.add(_lop().functions.hashOrder(order_tuple))
+        batch.add(w3.eth.get_transaction_count(acc.address, "pending"))
+        batch.add(w3.eth.chain_id)
+        order_hash, nonce, chain_id = await batch.async_execute()
+    return HexBytes(order_hash), nonce, chain_id
     
+# The fields are ordered according to the ExtensionLib.sol enum; custom_data
+# trails the concatenated fields and has no slot in the offset header.
+_EXTENSION_FIELD_ORDER = (
+    "maker_asset_suffix", "taker_asset_suffix", "making_amount_data",
+    "taking_amount_data", "predicate", "maker_permit",
+    "pre_interaction_data", "post_interaction_data",
+)
+# Eight big-endian uint32 end-offsets, field 0 in the lowest 32 bits
+_EXTENSION_HEADER = struct.Struct(">8I")
+
 def build_extension_bytes(factory_address: str, maker_traits: int) -> bytes:
     """
     Correctly builds the extension data with an offset header and concatenated data,
     as required by ExtensionLib.sol.
     """
-    # The fields are ordered according to the contract's enum
     # We only need to provide data for the fields we're using.
     fields = {
         "post_interaction_data": bytes.fromhex(factory_address.replace("0x", "")),
-        "custom_data": maker_traits.to_bytes(32, 'big')
     }
-    
-    FIELD_ORDER = [
-        "maker_asset_suffix", "taker_asset_suffix", "making_amount_data",
-        "taking_amount_data", "predicate", "maker_permit",
-        "pre_interaction_data", "post_interaction_data" # Note: custom_data is handled separately
-    ]
-
-    offsets = 0
-    concatenated_data = b""
-    current_offset = 0
-
-    # Build the offset header and concatenated data for the first 8 fields
-    for i, field_name in enumerate(FIELD_ORDER):
-        field_data = fields.get(field_name, b'')
-        current_offset += len(field_data)
-        concatenated_data += field_data
-        # Pack the current end-offset into the 256-bit integer
-        offsets |= (current_offset << (i * 32))
-
-    header = offsets.to_bytes(32, 'big')
-    custom_data_bytes = fields.get("custom_data", b'')
+    field_data = [fields.get(name, b"") for name in _EXTENSION_FIELD_ORDER]
+    end_offsets = itertools.accumulate(len(data) for data in field_data)
+    header = _EXTENSION_HEADER.pack(*reversed(tuple(end_offsets)))
 
     # The final extension is: 32-byte offsets + concatenated data + custom data
-    return header + concatenated_data + custom_data_bytes
+    return b"".join((header, *field_data, maker_traits.to_bytes(32, 'big')))
+
+# Bit 224-247: ARGS_EXTENSION_LENGTH
+_ARGS_EXTENSION_LENGTH_SHIFT = 224
 
 def build_taker_traits(extension_length: int) -> int:
     """
     Builds the taker_traits integer, specifying the length of the extension.
     """
-    # Bit 224-247: ARGS_EXTENSION_LENGTH
-    return extension_length << 224
+    return extension_length << _ARGS_EXTENSION_LENGTH_SHIFT
+
+_HAS_EXTENSION_FLAG                 = 1 << 249
+_POST_INTERACTION_CALL_FLAG         = 1 << 251
+_NO_PARTIAL_FILLS_FLAG              = 1 << 255
+_MAKER_TRAITS                       = _HAS_EXTENSION_FLAG | _POST_INTERACTION_CALL_FLAG | _NO_PARTIAL_FILLS_FLAG
 
 # ─────────────────────────────────────────────────────────────── magic logic
-def test() -> None:
+async def test() -> None:
     
     # ────────────────────────────────────────────────────────── participants
-    RPC_URL                         = os.getenv("EVM_RPC", "")
-    w3                              = Web3(Web3.HTTPProvider(RPC_URL))
-
     maker_account: LocalAccount     = Account.from_key(os.getenv("EVM_MAKER_SC"))
     resolver_account: LocalAccount  = Account.from_key(os.getenv("EVM_RESOLVER_SC"))
+    resolver                        = _resolver()
+    factory                         = _factory()
+    _start_head_listener(os.getenv("EVM_WS_RPC", ""))
     # ──────────────────────────────────────────────────────────
 
     ONE_ETH                         = 10**18
@@ -109,10 +119,7 @@ def test() -> None:
     maker                           = int(maker_account.address, 16)
     taker                           = int(resolver_account.address, 16)
 
-    maker_traits = 0
-    maker_traits |= (1 << 249)  # HAS_EXTENSION_FLAG 
-    maker_traits |= (1 << 251)  # POST_INTERACTION_CALL_FLAG_POSITION
-    maker_traits |= (1 << 255)  # _NO_PARTIAL_FILLS_FLAG
+    maker_traits = _MAKER_TRAITS
 
     ESCROW_FACTORY_ADDRESS = resolver.address
     extension_bytes = build_extension_bytes(ESCROW_FACTORY_ADDRESS, maker_traits)
@@ -135,7 +142,7 @@ def test() -> None:
         TAKING_AMT,     # takingAmount uint256
         maker_traits,   # makerTraits uint256
     )
-    order_hash = _order_hash(order_data)
+    order_hash, nonce, chain_id = await _prefetch(order_data, resolver_account)
     print(f"orderHash  : {order_hash.hex()}")
 
     # ────────────────────────────────────────────────────────── build & verify signature locally
@@ -146,12 +153,15 @@ def test() -> None:
     vs_bytes = vs_int.to_bytes(32, "big")
 
     # ────────────────────────────────────────────────────────── off‑chain sanity check – abort if it doesn’t recover to maker
-    recovered = Account._recover_hash(order_hash, vrs=(sig.v, sig.r, sig.s))
-    if recovered.lower() != order_hash_signer.address.lower():
-        sys.exit(
-            f"✗ Signature would recover to {recovered}, "
-            f"not {order_hash_signer.address}. Aborting."
-        )
+    # we just signed with the maker's own key, so the ECDSA recovery is opt-in debugging
+    if __debug__ and os.getenv("RELAYER_VERIFY_SIG") == "1":
+        recovered = keys.Signature(vrs=(sig.v - 27, sig.r, sig.s)) \
+            .recover_public_key_from_msg_hash(order_hash).to_checksum_address()
+        if recovered != order_hash_signer.address:
+            sys.exit(
+                f"✗ Signature would recover to {recovered}, "
+                f"not {order_hash_signer.address}. Aborting."
+            )
     # ────────────────────────────────────────────────────────── prepare immutables & structs
     secret = os.urandom(32)
     print(f"secret     : {secret.hex()}")
@@ -181,15 +191,8 @@ def test() -> None:
         args                # bytes calldata args
     )
 
-    print("\n🚀 deploySrc …")
-    receipt_src = _send_tx(w3, resolver_account, fn_src, value=SAFETY_DEP + TAKING_AMT)
-    print("\n⏳ Waiting for 5 seconds before processing the event...")
-    time.sleep(5)
-    ev = factory.events.SrcEscrowCreated().get_logs(from_block=receipt_src['blockNumber'])
-    print(f"\n✅ Src escrow deployed: {ev}")
-    
     # -------------------   deployDst  -------------------------------------
-    current_block_number = w3.eth.block_number
+    current_block_number = await w3.eth.block_number
     timelocks_dst = 0 #_pack_timelocks(10, 100, 101, 0)
     dst_immutables: Tuple[Any, ...] = (
         order_hash,
@@ -202,23 +205,30 @@ def test() -> None:
         timelocks_dst
     )
     relock = (src_immutables[7] >> 128) & ((1 << 64) - 1)
-    cancel_ts = w3.eth.get_block(current_block_number).get('timestamp') + relock + 100
+    cancel_ts = (await w3.eth.get_block(current_block_number)).get('timestamp') + relock + 100
 
     fn_dst = resolver.functions.deployDst(
         dst_immutables, # IBaseEscrow.Immutables calldata dstImmutables
         cancel_ts   ,   # uint256 srcCancellationTimestamp
     )
-    print(f"\n🛠  deployDst … with value {TAKING_AMT + SAFETY_DEP}")
-    _send_tx(w3, resolver_account, fn_dst, value=TAKING_AMT + SAFETY_DEP)
+    # both deployments are independent: send them back to back with nonce, nonce + 1
+    print(f"\n🚀 deploySrc + deployDst … with dst value {TAKING_AMT + SAFETY_DEP}")
+    receipt_src, receipt_dst = await _send_txs(w3, resolver_account, [
+        (fn_src, SAFETY_DEP + TAKING_AMT),
+        (fn_dst, TAKING_AMT + SAFETY_DEP),
+    ], CHAIN_ID=chain_id, nonce=nonce)
+    # the event is already in the receipt, decode it locally instead of another getLogs
+    ev = factory.events.SrcEscrowCreated().process_receipt(receipt_src, errors=DISCARD)
+    print(f"\n✅ Src escrow deployed: {ev}")
 
     print("\n✅ All done – both escrows deployed.")
-    print("\n⏳ Waiting for 5 seconds before withdrawing...")
-    time.sleep(5)
 
-    src_escrow_addr = input("Enter src escrow address: ")
-    SRC_ESCROW_ADDR = Web3.to_checksum_address(src_escrow_addr)
-    dst_escrow_addr = input("Enter dst escrow address: ")
-    DST_ESCROW_ADDR = Web3.to_checksum_address(dst_escrow_addr)
+    # the src escrow is a CREATE2 clone of the immutables the factory emitted
+    SRC_ESCROW_ADDR = _csum(
+        await factory.functions.addressOfEscrowSrc(ev[0]["args"]["srcImmutables"]).call()
+    )
+    ev_dst = factory.events.DstEscrowCreated().process_receipt(receipt_dst, errors=DISCARD)
+    DST_ESCROW_ADDR = _csum(ev_dst[0]["args"]["escrow"])
 
     fn_withdraw = resolver.functions.withdraw(
         SRC_ESCROW_ADDR,
@@ -226,12 +236,12 @@ def test() -> None:
         src_immutables
     )
     print(f"\n🛠  withdraw from src escrow {SRC_ESCROW_ADDR}")
-    _send_tx(w3, resolver_account, fn_withdraw)
+    await _send_tx(w3, resolver_account, fn_withdraw, CHAIN_ID=chain_id)
     fn_withdraw = resolver.functions.withdraw(
         DST_ESCROW_ADDR,
         secret,
         dst_immutables
     )
     print(f"\n🛠  withdraw from dst escrow {DST_ESCROW_ADDR}")
-    _send_tx(w3, resolver_account, fn_withdraw)
+    await _send_tx(w3, resolver_account, fn_withdraw, CHAIN_ID=chain_id)
     print("\n✅ Withdrawn from both escrows.")
@@ -1,60 +1,111 @@
-from typing import Any, Dict, Tuple
+import asyncio, functools, os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, List, Optional, Sequence, Tuple
 from hexbytes import HexBytes
-from web3 import Web3
+from web3 import AsyncWeb3, Web3, WebSocketProvider
+from web3.exceptions import TransactionNotFound
 from web3.types import TxParams, TxReceipt
-from web3.contract.contract import ContractFunction
+from web3.contract.async_contract import AsyncContractFunction
 from eth_account.signers.local import LocalAccount
 from eth_abi.abi import encode as abi_encode
+import orjson
 
-def _send_tx(w3: Web3, acc: LocalAccount, fn: ContractFunction, value: int = 0, CHAIN_ID: int = 11155111) -> TxReceipt:
+def _load_abi(path: str) -> Any:
+    """Parsed JSON of an ABI file, read from disk only when the file changes."""
+    return _read_json(path, os.path.getmtime(path))
+
+@functools.lru_cache(maxsize=None)
+def _read_json(path: str, mtime: float) -> Any:  # keyed on mtime so an edited file is re-read
+    return orjson.loads(Path(path).read_bytes())
+
+# RLP encoding and secp256k1 signing are CPU bound, keep them off the event loop
+_SIGNING_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="tx-signer")
+
+# pulsed (and counted) on every newHeads push while a head listener is running
+_new_head = asyncio.Event()
+_head_count = 0
+_head_task: Optional[asyncio.Task] = None
+
+async def _listen_heads(ws_url: str) -> None:
+    global _head_count
+    async with AsyncWeb3(WebSocketProvider(ws_url)) as ws:
+        await ws.eth.subscribe("newHeads")
+        async for _ in ws.socket.process_subscriptions():
+            _head_count += 1
+            _new_head.set()
+            _new_head.clear()
+
+def _start_head_listener(ws_url: str) -> Optional[asyncio.Task]:
+    """Follow newHeads over `ws_url` so receipt waits poll once per block; no-op without a URL."""
+    global _head_task
+    if ws_url and _head_task is None:
+        _head_task = asyncio.create_task(_listen_heads(ws_url))
+    return _head_task
+
+async def _wait_receipt(w3: AsyncWeb3, tx_hash: HexBytes, timeout: float = 120) -> TxReceipt:
+    """
+    Wait for a receipt, checking once per new block instead of every 100 ms.
+    Falls back to web3's polling wait when no head listener is running.
+    """
+    if _head_task is None or _head_task.done():
+        return await w3.eth.wait_for_transaction_receipt(tx_hash, timeout=timeout)
+    async with asyncio.timeout(timeout):
+        while True:
+            seen = _head_count
+            try:
+                return await w3.eth.get_transaction_receipt(tx_hash)
+            except TransactionNotFound:
+                # a head may have landed while the lookup was in flight
+                while _head_count == seen:
+                    await _new_head.wait()
+
+async def _sign_tx(w3: AsyncWeb3, acc: LocalAccount, fn: AsyncContractFunction, nonce: int, value: int = 0, CHAIN_ID: int = 11155111) -> HexBytes:
     base: TxParams = {}
     base['from'] = acc.address
     base['chainId'] = CHAIN_ID
     base['gas'] = 2_500_000
     base['gasPrice'] = w3.to_wei("0.5", "gwei")
-    base['nonce'] = w3.eth.get_transaction_count(acc.address, "pending")
-    tx      = fn.build_transaction(base | {"value": value}) # type: ignore
-    signed  = acc.sign_transaction(tx) # type: ignore
-    tx_hash = w3.eth.send_raw_transaction(signed.raw_transaction)
-    receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
-    print(f"✓ {tx_hash.hex()} confirmed in block {receipt['blockNumber']}")
+    base['nonce'] = nonce # type: ignore
+    # every field is preset, so building only ABI-encodes the call without any RPC
+    tx      = await fn.build_transaction(base | {"value": value}) # type: ignore
+    signed  = await asyncio.get_running_loop().run_in_executor(_SIGNING_POOL, acc.sign_transaction, tx) # type: ignore
+    return signed.raw_transaction
+
+async def _send_txs(w3: AsyncWeb3, acc: LocalAccount, calls: Sequence[Tuple[AsyncContractFunction, int]], CHAIN_ID: int = 11155111, nonce: Optional[int] = None) -> List[TxReceipt]:
+    """
+    Submit independent calls from one account concurrently: the pending nonce is
+    fetched once (unless the caller prefetched it) and handed out sequentially,
+    then all sends and all receipt waits run in parallel.
+    """
+    base_nonce = nonce if nonce is not None else await w3.eth.get_transaction_count(acc.address, "pending")
+    raw_txs = await asyncio.gather(*(
+        _sign_tx(w3, acc, fn, base_nonce + i, value, CHAIN_ID)
+        for i, (fn, value) in enumerate(calls)
+    ))
+    tx_hashes = await asyncio.gather(*(w3.eth.send_raw_transaction(raw) for raw in raw_txs))
+    receipts = await asyncio.gather(*(_wait_receipt(w3, h) for h in tx_hashes))
+    for tx_hash, receipt in zip(tx_hashes, receipts):
+        print(f"✓ {tx_hash.hex()} confirmed in block {receipt['blockNumber']}")
+    return list(receipts)
+
+async def _send_tx(w3: AsyncWeb3, acc: LocalAccount, fn: AsyncContractFunction, value: int = 0, CHAIN_ID: int = 11155111) -> TxReceipt:
+    (receipt,) = await _send_txs(w3, acc, [(fn, value)], CHAIN_ID)
     return receipt
 
+_ORDER_TYPEHASH = Web3.keccak(
+    text="Order(uint256 salt,Address maker,Address receiver,Address makerAsset,"
+    "Address takerAsset,uint256 makingAmount,uint256 takingAmount,"
+    "MakerTraits makerTraits)"
+)
+# typehash followed by salt, maker, receiver, makerAsset, takerAsset,
+# makingAmount, takingAmount, makerTraits
+_ORDER_STRUCT_TYPES = ("bytes32",) + ("uint256",) * 8
+
 def _order_hash_local(w3: Web3, ds: Any, order: Tuple[Any, ...]) -> HexBytes:
     """
     Bytes-perfect mirror of OrderLib.hashOrder() for contracts that pre-date
     `hashOrder()` being public.
     """
-    _ORDER_TYPEHASH = w3.keccak(
-        text="Order(uint256 salt,Address maker,Address receiver,Address makerAsset,"
-        "Address takerAsset,uint256 makingAmount,uint256 takingAmount,"
-        "MakerTraits makerTraits)"
-    )
-    keys = ("salt","maker","receiver","makerAsset","takerAsset",
-                "makingAmount","takingAmount","makerTraits")
-    order_dict: Dict = dict(zip(keys, order)) # type: ignore
-    struct_enc = abi_encode(
-        [
-            "bytes32",
-            "uint256",
-            "uint256",
-            "uint256",
-            "uint256",
-            "uint256",
-            "uint256",
-            "uint256",
-            "uint256",
-        ],
-        [
-            _ORDER_TYPEHASH,
-            order_dict["salt"],
-            order_dict["maker"],
-            order_dict["receiver"],
-            order_dict["makerAsset"],
-            order_dict["takerAsset"],
-            order_dict["makingAmount"],
-            order_dict["takingAmount"],
-            order_dict["makerTraits"],
-        ],
-    )
-    return HexBytes(w3.keccak(b"\x19\x01" + ds + w3.keccak(struct_enc)))
\ No newline at end of file
+    struct_enc = abi_encode(_ORDER_STRUCT_TYPES, (_ORDER_TYPEHASH, *order))
+    return HexBytes(w3.keccak(b"\x19\x01" + ds + w3.keccak(struct_enc)))
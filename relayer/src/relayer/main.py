@@ -2,14 +2,13 @@ from contextlib import asynccontextmanager
 import asyncio, logging, os
 import aiohttp
 import dotenv
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from rich.logging import RichHandler
 import uvicorn
-from pydantic import BaseModel
-import requests
+import msgspec
 
-from .db import InterstellarDb, Order
+from .db import Order, get_db
 
 from .ethereum_watcher import EthereumWatcher
 from .stellar_watcher import StellarWatcher
@@ -26,22 +25,14 @@ async def lifespan(app: FastAPI):
             handlers=[RichHandler(rich_tracebacks=True)],
         )
         dotenv.load_dotenv()
-        InterstellarDb()
+        get_db()
+        app.state.http = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=5))
         resolvers_env = os.getenv("RESOLVERS", "")
-        healthy = []
-        for addr in resolvers_env.split(","):
-            addr = addr.strip()
-            if not addr:
-                continue
-            try:
-                resp = requests.get(f"{addr}/health", timeout=5)
-                if resp.status_code == 200:
-                    healthy.append(addr)
-                    log.info(f"Resolver {addr} is healthy")
-                else:
-                    log.warning(f"Resolver {addr} unhealthy status {resp.status_code}")
-            except Exception as err:
-                log.warning(f"Unable to reach resolver {addr}: {err}")
+        addrs = [addr.strip() for addr in resolvers_env.split(",") if addr.strip()]
+        checks = await asyncio.gather(
+            *(check_resolver(app.state.http, addr, log) for addr in addrs)
+        )
+        healthy = [addr for addr, ok in zip(addrs, checks) if ok]
         app.state.resolvers = healthy
         log.info(f"Using {len(healthy)} healthy resolver(s): {healthy}")
 
@@ -54,26 +45,52 @@ async def lifespan(app: FastAPI):
             # Ensure background tasks are cancelled on shutdown
             watchers_task.cancel()
             await watchers_task
+            await app.state.http.close()
             print("Shutting down the application")
     except Exception as e:
         log.error(f"Lifespan error: {e}")
 
 
-async def produce(watcher, queue):
+async def check_resolver(session: aiohttp.ClientSession, addr: str, log: logging.Logger) -> bool:
+    try:
+        async with session.get(f"{addr}/health") as resp:
+            if resp.status == 200:
+                log.info(f"Resolver {addr} is healthy")
+                return True
+            log.warning(f"Resolver {addr} unhealthy status {resp.status}")
+    except Exception as err:
+        log.warning(f"Unable to reach resolver {addr}: {err}")
+    return False
+
+
+async def notify_resolver(session: aiohttp.ClientSession, resolver: str, payload) -> None:
+    try:
+        async with session.post(f"{resolver}/order", json=payload) as response:
+            if response.status != 200:
+                logging.error(f"Failed to notify resolver {resolver}: {await response.text()}")
+    except Exception as e:
+        logging.error(f"Error notifying resolver {resolver}: {e}")
+
+
+async def produce(watcher, queue: asyncio.Queue):
     async for ev in watcher.watch_events():
-        await queue.put(ev)
+        try:
+            queue.put_nowait(ev)
+        except asyncio.QueueFull:
+            logging.warning(f"Event queue full, dropping {ev}")
 
 
 async def initialize_watchers(log: logging.Logger):
     mode = os.getenv("MODE", "D").upper()
+    fsm = SwapStateMachine()
     ethereum_watcher = None
     stellar_watcher = None
 
     if mode in ["E", "D"]:
         log.info(f"{mode} mode, initializing Ethereum watcher...")
-        EVM_RPC = os.getenv("EVM_RPC") or ""
-        if not EVM_RPC:
-            log.error("EVM_RPC not set, using default")
+        EVM_WS_RPC = os.getenv("EVM_WS_RPC") or ""
+        if not EVM_WS_RPC:
+            log.error("EVM_WS_RPC not set, using default")
             exit(1)
 
         ETHEREUM_ESCROW_ABI = os.getenv("ETHEREUM_ESCROW_ABI") or ""
@@ -87,7 +104,9 @@ async def initialize_watchers(log: logging.Logger):
             exit(1)
 
         ethereum_watcher = EthereumWatcher(
-            EVM_RPC, ETHEREUM_ESCROW_ABI, ETHEREUM_ESCROW_ADDRESS
+            EVM_WS_RPC, ETHEREUM_ESCROW_ABI, ETHEREUM_ESCROW_ADDRESS,
+            os.getenv("ETHEREUM_CURSOR_PATH") or "ethereum_cursor",
+            decode=fsm.accepts(),
         )
 
     if mode in ["S", "D"]:
@@ -105,8 +124,7 @@ async def initialize_watchers(log: logging.Logger):
         stellar_watcher = StellarWatcher(STELLAR_RPC, STELLAR_CONTRACT_ID)
 
     log.info("Starting relayer...")
-    fsm = SwapStateMachine()
-    queue = asyncio.Queue()
+    queue = asyncio.Queue(maxsize=1024)
     producers = []
     if ethereum_watcher:
         producers.append(asyncio.create_task(produce(ethereum_watcher, queue)))
@@ -119,6 +137,22 @@ async def initialize_watchers(log: logging.Logger):
     finally:
         for p in producers:
             p.cancel()
+        if stellar_watcher:
+            await stellar_watcher.aclose()
+
+def msgspec_body(model):
+    # /order and /secret bodies go to the db and the resolvers as-is; one Decoder per route,
+    # and a malformed body still gets FastAPI's 422
+    decoder = msgspec.json.Decoder(model)
+
+    async def decode(request: Request):
+        try:
+            return decoder.decode(await request.body())
+        except msgspec.DecodeError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+
+    return decode
+
 
 app = FastAPI(lifespan=lifespan)
 origins = [
@@ -126,16 +160,11 @@ origins = [
 ]
 
 @app.post("/order")
-async def create_order(order: Order):
-    interstellar_order = InterstellarDb().create_order(order)
-    for resolver in app.state.resolvers:
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(f"{resolver}/order", json=interstellar_order) as response:
-                    if response.status != 200:
-                        logging.error(f"Failed to notify resolver {resolver}: {await response.text()}")
-        except Exception as e:
-            logging.error(f"Error notifying resolver {resolver}: {e}")
+async def create_order(order: Order = Depends(msgspec_body(Order))):
+    interstellar_order = get_db().create_order(order)
+    await asyncio.gather(
+        *(notify_resolver(app.state.http, resolver, interstellar_order) for resolver in app.state.resolvers)
+    )
     logging.info(f"Order created with ID: {interstellar_order.order_id}")
     return {"status": "success", "order_id": interstellar_order.order_id}
 
@@ -144,14 +173,14 @@ async def get_order_status(order_id: str):
     status = "pending" if order_id else "escrow_id"
     return {"status": status}
 
-class Secret(BaseModel):
+class Secret(msgspec.Struct):
     maker_address: str
     value: str
 
 @app.post("/secret")
-async def create_secret(secret: Secret):
+async def create_secret(secret: Secret = Depends(msgspec_body(Secret))):
     # Handle secret creation
-    return {"status": "success", "secret": secret}
+    return {"status": "success", "secret": msgspec.structs.asdict(secret)}
 
 app.add_middleware(
     CORSMiddleware,
@@ -163,5 +192,5 @@ app.add_middleware(
 
 if __name__ == "__main__":
     from .evm_relayer import test
-    test()
+    asyncio.run(test())
     # uvicorn.run("src.relayer.main:app", host="0.0.0.0", port=8000, reload=True)
@@ -5,6 +5,10 @@ class SwapStateMachine:
         self.log = logging.getLogger("FSM")
         self.swaps = {}  # hash -> dict of eth/xlm deposit/claim
 
+    def accepts(self) -> bool:
+        """Whether handle() consumes event payloads; watchers skip decoding when it doesn't."""
+        return False
+
     def handle(self, ev):
         return
         h = ev["data"].get("hash") or ev["data"]
@@ -1,8 +1,10 @@
-import enum
+import base64, enum, functools
 import asyncio, logging
-import requests
+import httpx
+import orjson
+from dataclasses import dataclass, field
 from xmlrpc.client import DateTime
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 import stellar_sdk
 from stellar_sdk.soroban_server_async import SorobanServerAsync
@@ -13,163 +15,259 @@ class StellarWatcherStatus(enum.Enum):
     STOPPED = "stopped"
 
 
+ACTIVE_POLL_INTERVAL = 0.2
+IDLE_BACKOFF_MIN = 1.0
+IDLE_BACKOFF_MAX = 5.0
+LEDGER_CLOSE_TIME = 5.0
+JSON_HEADERS = {"content-type": "application/json"}
+LATEST_LEDGER_REQUEST = {"jsonrpc": "2.0", "id": 1, "method": "getLatestLedger"}
+
+
 class StellarWatcher:
     def __init__(self, rpc_url: str, contract_id: str):
         self.rpc_url = rpc_url
         self.server = SorobanServerAsync(rpc_url)
+        # one keep-alive connection pool for every getEvents poll
+        self._client = httpx.AsyncClient(
+            http2=True,
+            timeout=10.0,
+            limits=httpx.Limits(max_keepalive_connections=4, keepalive_expiry=60),
+        )
         self.contract_id = contract_id
         self.cursor = None
         self.page_size = 100
+        self._idle_backoff = IDLE_BACKOFF_MIN
+        self._last_seen_ledger = 0
+        # loop time from which a new ledger is likely enough to send the gate and getEvents together
+        self._batch_after = 0.0
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=256)
+        self._producer_task: Optional[asyncio.Task] = None
         self.log = logging.getLogger("StellarWatcher")
         self.status: StellarWatcherStatus = StellarWatcherStatus.RUNNING
+        # the filter never changes: serialize the topic XDR once, copy only what varies per call
+        self._topic_xdr = stellar_sdk.scval.to_symbol("1inch_order_created").to_xdr()
+        self._req_template = {
+            "jsonrpc": "2.0",
+            "id": 8675309,
+            "method": "getEvents",
+            "params": {
+                "filters": [
+                    {
+                        "type": "contract",
+                        "contractIds": [self.contract_id],
+                        "topics": [[self._topic_xdr]],
+                    }
+                ],
+                "pagination": {
+                    "limit": self.page_size,
+                },
+            },
+        }
 
     async def watch_events(self):
-        last_ledger = await self.server.get_latest_ledger()
-        backfill_ledger = max(0, last_ledger.sequence - 2000)
-        self.log.info(
-            f"Starting event watch on contract {self.contract_id} (backfill from ledger {backfill_ledger})..."
-        )
+        # fetching runs ahead in its own task; the queue bounds how far it gets
+        if self._producer_task is None or self._producer_task.done():
+            self._producer_task = asyncio.create_task(self._producer())
+        while True:
+            item = await self._queue.get()
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    async def _producer(self):
+        # whatever escapes the retry loop reaches the consumer instead of dying with the task
+        try:
+            await self._fetch_loop()
+        except Exception as err:
+            await self._queue.put(err)
+
+    async def _fetch_loop(self):
+        loop = asyncio.get_running_loop()
+        backfill_ledger = None
         first = True
+        more_pages = False
         while True:
             try:
+                if backfill_ledger is None:
+                    last_ledger = await self.server.get_latest_ledger()
+                    backfill_ledger = max(0, last_ledger.sequence - 2000)
+                    self.log.info(
+                        f"Starting event watch on contract {self.contract_id} (backfill from ledger {backfill_ledger})..."
+                    )
                 if first:
-                    resp = await asyncio.to_thread(
-                        requests.post,
-                        self.rpc_url,
-                        json=self.make_request(start_ledger=backfill_ledger),
+                    resp_data = await self._rpc(self.make_request(start_ledger=backfill_ledger))
+                elif more_pages:
+                    # the previous page was full: no ledger gate, fetch the next page straight away
+                    resp_data = await self._rpc(
+                        self.make_request(start_ledger=backfill_ledger, cursor=self.cursor)
                     )
-                    backfill_ledger = resp.json()["result"]["latestLedger"]
-                    first = False
-                else:
-                    resp = await asyncio.to_thread(
-                        requests.post,
-                        self.rpc_url,
-                        json=self.make_request(
-                            start_ledger=backfill_ledger, cursor=self.cursor
-                        ),
+                elif loop.time() < self._batch_after:
+                    # a new ledger is unlikely yet: the cheap gate goes alone, getEvents only follows
+                    # once the sequence has moved
+                    latest = (await self._rpc(LATEST_LEDGER_REQUEST))["result"]["sequence"]
+                    if latest <= self._last_seen_ledger:
+                        await asyncio.sleep(self._idle_sleep())
+                        continue
+                    resp_data = await self._rpc(
+                        self.make_request(start_ledger=backfill_ledger, cursor=self.cursor)
                     )
-                self.log.debug(f"RPC response (cursor={self.cursor}): {resp}")
-                resp_data = resp.json()
-                self.cursor = resp_data["result"]["cursor"]
+                else:
+                    # a ledger has most likely closed since the last page: gate and page share one
+                    # round trip, matched back by id
+                    replies = await self._rpc([
+                        LATEST_LEDGER_REQUEST,
+                        self.make_request(start_ledger=backfill_ledger, cursor=self.cursor),
+                    ])
+                    replies = {r["id"]: r for r in replies}
+                    latest = replies[LATEST_LEDGER_REQUEST["id"]]["result"]["sequence"]
+                    if latest <= self._last_seen_ledger:
+                        # the ledger is late, go back to the gate alone rather than paging every tick
+                        self._batch_after = loop.time() + LEDGER_CLOSE_TIME
+                        await asyncio.sleep(self._idle_sleep())
+                        continue
+                    resp_data = replies[self._req_template["id"]]
+                if first:
+                    backfill_ledger = resp_data["result"]["latestLedger"]
+                    first = False
+                result = resp_data["result"]
+                if "cursor" in result:
+                    self.cursor = result["cursor"]
+                if result["latestLedger"] > self._last_seen_ledger:
+                    self._batch_after = loop.time() + LEDGER_CLOSE_TIME
+                self._last_seen_ledger = result["latestLedger"]
 
-                if not resp_data["result"]["events"]:
-                    self.log.info("No new events found, sleeping...")
-                    await asyncio.sleep(3)
+                events = result["events"]
+                more_pages = len(events) >= self.page_size
+                if not events:
+                    self.log.debug("No new events found, sleeping...")
+                    await asyncio.sleep(self._idle_sleep())
+                    continue
+                self._idle_backoff = IDLE_BACKOFF_MIN
+                # XDR decoding is CPU-bound, keep it off the loop so the next fetch can proceed
+                for event in await asyncio.to_thread(_decode_events, events):
+                    self.log.info("Stellar event: %s", event)
+                    await self._queue.put({"chain": "xlm", "event": event.type, "data": []})
+                if more_pages:
                     continue
-                for ev in resp_data["result"]["events"]:
-                    event = StellarEvent.from_rpc_response(ev)
-                    self.log.info(f"Stellar event: {event}")
-                    try:
-                        yield {"chain": "xlm", "event": event.type, "data": []}
-                    except Exception as e:
-                        self.log.error(f"Error decoding event data: {e}")
-                        continue
 
             except Exception as e:
                 self.log.error(f"Error fetching events: {e}")
                 await asyncio.sleep(3)
                 continue
 
-            await asyncio.sleep(3)
+            await asyncio.sleep(ACTIVE_POLL_INTERVAL)
 
-    def make_request(self, start_ledger=None, cursor=None) -> Dict:
-        base = {
-            "jsonrpc": "2.0",
-            "id": 8675309,
-            "method": "getEvents",
-            "params": {
-                "filters": [
-                    {
-                        "type": "contract",
-                        "contractIds": [self.contract_id],
-                        "topics": [
-                            [stellar_sdk.scval.to_symbol("1inch_order_created").to_xdr()]
-                        ],
-                    }
-                ],
-                "pagination": {
-                    "limit": self.page_size,
-                },
-            },
-        }
+    async def _rpc(self, payload: Any) -> Any:
+        """POST a JSON-RPC request, or a batch of them, over the pooled client."""
+        resp = await self._client.post(
+            self.rpc_url, content=orjson.dumps(payload), headers=JSON_HEADERS
+        )
+        self.log.debug("RPC response (cursor=%s): %s", self.cursor, resp)
+        return orjson.loads(resp.content)
 
-        if start_ledger is not None:
-            base["params"]["startLedger"] = start_ledger
-        if cursor is not None:
-            base["params"]["cursor"] = cursor
+    def _idle_sleep(self) -> float:
+        """Grow the idle poll interval towards one ledger close time."""
+        self._idle_backoff = min(self._idle_backoff * 1.5, IDLE_BACKOFF_MAX)
+        return self._idle_backoff
 
-        return base
+    async def aclose(self):
+        if self._producer_task is not None:
+            self._producer_task.cancel()
+        await self._client.aclose()
+        await self.server.close()
+
+    def make_request(self, start_ledger=None, cursor=None) -> Dict:
+        params = self._req_template["params"]
+        if start_ledger is not None or cursor is not None:
+            params = dict(params)
+            if start_ledger is not None:
+                params["startLedger"] = start_ledger
+            if cursor is not None:
+                params["cursor"] = cursor
+        return {**self._req_template, "params": params}
 
 
 class StellarEventType(enum.Enum):
     CONTRACT = "contract"
 
 
+@dataclass(slots=True)
 class StellarEvent:
+    id: str = ""
+    type: StellarEventType = StellarEventType.CONTRACT
+    ledger: int = 0
+    ledger_closed_at: DateTime = field(default_factory=lambda: DateTime("1970-01-01T00:00:00"))
+    contract_id: str = ""
+    operation_index: int = 0
+    transaction_index: int = 0
+    tx_hash: str = ""
+    is_successful_contract_call: bool = False
+    topics: List[str] = field(default_factory=list)
+    value: Any = ""
 
-    def __init__(self) -> None:
-        self.id: str = ""
-        self.type: StellarEventType = StellarEventType.CONTRACT
-        self.ledger: int = 0
-        self.ledger_closed_at: DateTime = DateTime(
-            "1970-01-01T00:00:00"
-        )
-        self.contract_id: str = ""
-        self.operation_index: int = 0
-        self.transaction_index: int = 0
-        self.tx_hash: str = ""
-        self.is_successful_contract_call: bool = False
-        self.topics: List[str] = []
-        self.value: Any = ""
-
-    def __str__(self) -> str:
-        return (
-            f"StellarEvent(id={self.id}, type={self.type}, ledger={self.ledger}, "
-            f"ledger_closed_at={self.ledger_closed_at}, contract_id={self.contract_id}, "
-            f"operation_index={self.operation_index}, transaction_index={self.transaction_index}, "
-            f"tx_hash={self.tx_hash}, is_successful_contract_call={self.is_successful_contract_call}, "
-            f"topics={self.topics}, value={self.value})"
-        )
-
-    @staticmethod
-    def from_rpc_response(data: Dict) -> "StellarEvent":
+    @classmethod
+    def from_rpc_response(cls, data: Dict) -> "StellarEvent":
         """
         Create a StellarEvent instance from raw RPC response data.
         """
-        event = StellarEvent()
-        event.id = data.get("id", "")
-        event.type = StellarEventType(data.get("type", "contract"))
-        event.ledger = data.get("ledger", 0)
-        event.ledger_closed_at = DateTime(
-            data.get("ledgerClosedAt", "1970-01-01T00:00:00")
+        event_value = data.get("value", "None")
+        return cls(
+            id=data.get("id", ""),
+            type=StellarEventType(data.get("type", "contract")),
+            ledger=data.get("ledger", 0),
+            ledger_closed_at=DateTime(data.get("ledgerClosedAt", "1970-01-01T00:00:00")),
+            contract_id=data.get("contractId", ""),
+            operation_index=data.get("operationIndex", 0),
+            transaction_index=data.get("transactionIndex", 0),
+            tx_hash=data.get("txHash", ""),
+            is_successful_contract_call=data.get("isSuccessfulContractCall", False),
+            topics=[
+                parsed
+                for topic in data.get("topic", [])
+                if topic is not None
+                for parsed in _parse_topic_cached(topic)
+            ],
+            value=_parse_value_cached(event_value) if event_value is not None else "",
         )
-        event.contract_id = data.get("contractId", "")
-        event.operation_index = data.get("operationIndex", 0)
-        event.transaction_index = data.get("transactionIndex", 0)
-        event.tx_hash = data.get("txHash", "")
-        event.is_successful_contract_call = data.get("isSuccessfulContractCall", False)
-        for topic in data.get("topic", []):
-            if topic is None:
-                continue
-            sc_val = stellar_sdk.stellar_xdr.SCVal.from_xdr(topic)
-            if sc_val.sym is not None:
-                event.topics.append(stellar_sdk.scval.from_symbol(sc_val))
-            if sc_val.address is not None:
-                event.topics.append(stellar_sdk.scval.from_address(sc_val).address)
-        if (event_value := data.get("value", "None")) is not None:
-            event.value = StellarEvent.value_from_scval(event_value)
-        return event
 
     @staticmethod
     def value_from_scval(event_value: str) -> Any:
-        value_sc_val = stellar_sdk.stellar_xdr.SCVal.from_xdr(event_value)
+        return StellarEvent._value_from_parsed(
+            stellar_sdk.stellar_xdr.SCVal.from_xdr(event_value)
+        )
+
+    @staticmethod
+    def _value_from_parsed(value_sc_val: stellar_sdk.xdr.SCVal) -> Any:
         if value_sc_val.vec is not None:
-            res = ""
-            for item in value_sc_val.vec.sc_vec:
-                res += str(StellarEvent.value_from_scval(item.to_xdr()))
-            return res
+            # children are already parsed, recurse on them directly
+            return "".join(
+                str(StellarEvent._value_from_parsed(item))
+                for item in value_sc_val.vec.sc_vec
+            )
         if value_sc_val.u32 is not None:
             return value_sc_val.u32.uint32
         if value_sc_val.i128 is not None:
             return stellar_sdk.scval.from_int128(value_sc_val)
         return None
+
+
+def _decode_events(events: List[Dict]) -> List["StellarEvent"]:
+    return [StellarEvent.from_rpc_response(ev) for ev in events]
+
+
+# Topic symbols (and often values) repeat across every event of a contract, so
+# each distinct XDR string is decoded only once.
+@functools.lru_cache(maxsize=256)
+def _parse_topic_cached(topic_xdr: str) -> tuple:
+    sc_val = stellar_sdk.stellar_xdr.SCVal.from_xdr_bytes(base64.b64decode(topic_xdr))
+    parsed = []
+    if sc_val.sym is not None:
+        parsed.append(stellar_sdk.scval.from_symbol(sc_val))
+    if sc_val.address is not None:
+        parsed.append(stellar_sdk.scval.from_address(sc_val).address)
+    return tuple(parsed)
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_value_cached(value_xdr: str) -> Any:
+    return StellarEvent.value_from_scval(value_xdr)
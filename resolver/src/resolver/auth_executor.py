@@ -0,0 +1,554 @@
+import asyncio, logging, random, threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from cachetools import TTLCache
+import stellar_sdk
+from stellar_sdk import (
+    Account,
+    Address,
+    InvokeHostFunction,
+    Keypair,
+    MuxedAccount,
+    Network,
+    SorobanServerAsync,
+    TransactionBuilder,
+    TransactionEnvelope,
+)
+from stellar_sdk.exceptions import (
+    BadRequestError,
+    ConnectionError,
+    Ed25519SecretSeedInvalidError,
+    PrepareTransactionException,
+    SorobanRpcErrorResponse,
+)
+from stellar_sdk.soroban_rpc import GetTransactionStatus, SendTransactionStatus
+from stellar_sdk.xdr import (
+    ContractDataDurability,
+    LedgerEntryType,
+    LedgerKey,
+    LedgerKeyContractData,
+    SCNonceKey,
+    SCVal,
+    SCValType,
+    SorobanAuthorizationEntry,
+    SorobanCredentialsType,
+    SorobanTransactionData,
+)
+
+from .http_client import HttpxClient
+from .soroban import address_to_scval, i128_to_scval, u64_to_scval, symbol_to_scval, vec_to_scval
+
+NETWORK_PASSPHRASES = {
+    "TESTNET": Network.TESTNET_NETWORK_PASSPHRASE,
+    "PUBLIC": Network.PUBLIC_NETWORK_PASSPHRASE,
+}
+SOROBAN_RPC_URL = "https://soroban-testnet.stellar.org"
+CONFIRMATION_BACKOFF_MIN = 0.2
+CONFIRMATION_BACKOFF_MAX = 2.0
+CONFIRMATION_RETRY_DELAY = 0.1
+CONFIRMATION_TIMEOUT = 30.0
+BATCH_WINDOW = 0.02
+BATCH_MAX_SIZE = 16
+SCAN_MIN_PENDING = 16
+SCAN_PAGE_LIMIT = 200
+# a full getTransactions page carries SCAN_PAGE_LIMIT envelopes with meta, weigh it like this
+# many getTransaction calls when choosing between a scan and per-hash polls
+SCAN_PAGE_COST = 8
+# JSON-RPC "method not found": the only error that rules getTransactions out for good
+RPC_METHOD_NOT_FOUND = -32601
+SIM_CACHE_SIZE = 512
+SIM_CACHE_TTL = 30
+ERROR_MESSAGE_LIMIT = 256
+# bounds, in stroops, on the fee of a client envelope the server account sponsors
+MIN_SPONSORED_FEE = 100
+MAX_SPONSORED_FEE = 5_000_000
+
+# sendTransaction outcomes that put the envelope in flight; anything else was not accepted
+_ACCEPTED = (SendTransactionStatus.PENDING, SendTransactionStatus.DUPLICATE)
+
+# typed client arguments, {"type": "...", "value": ...}
+_ARG_ENCODERS = {
+    "address": address_to_scval,
+    "i128": lambda v: i128_to_scval(int(v)),
+    "u64": lambda v: u64_to_scval(int(v)),
+    "u32": lambda v: stellar_sdk.scval.to_uint32(int(v)),
+    "bool": lambda v: stellar_sdk.scval.to_bool(bool(v)),
+    "string": stellar_sdk.scval.to_string,
+    "symbol": symbol_to_scval,
+    "bytes": lambda v: stellar_sdk.scval.to_bytes(bytes.fromhex(v)),
+    # an SCVal the client already encoded, base64 XDR
+    "xdr": SCVal.from_xdr,
+}
+
+
+def _str_to_scval(value: str) -> SCVal:
+    # a bare G/C StrKey is an address, anything else a symbol; 56 chars is longer than any
+    # symbol, so a StrKey with a bad checksum is an error rather than a symbol
+    if len(value) == 56 and value[0] in "GC":
+        return address_to_scval(value)
+    return symbol_to_scval(value)
+
+# one dict lookup per argument, keyed on the exact JSON-decoded type
+_SCVAL_DISPATCH = {
+    SCVal: lambda v: v,
+    dict: lambda v: _ARG_ENCODERS[v["type"]](v["value"]),
+    str: _str_to_scval,
+    bool: stellar_sdk.scval.to_bool,
+    int: stellar_sdk.scval.to_int64,
+    bytes: stellar_sdk.scval.to_bytes,
+    list: lambda v: vec_to_scval([_to_scval(item) for item in v]),
+}
+
+
+# argument types whose values become ledger keys (balances, allowances, per-hash state); vec and
+# map are included because they can carry either
+_FOOTPRINT_TYPES = (SCValType.SCV_ADDRESS, SCValType.SCV_BYTES, SCValType.SCV_VEC, SCValType.SCV_MAP)
+
+
+def _simulation_key(contract_id: str, method: str, parameters: List[SCVal], auth: List[SorobanAuthorizationEntry]):
+    """Key a simulation on everything that shapes its footprint, not just the argument types."""
+    # amounts and flags only nudge the resource fee, every value that names a ledger entry is kept
+    args = tuple(p.to_xdr() if p.type in _FOOTPRINT_TYPES else p.type for p in parameters)
+    # nonces are fresh per request and their entries are swapped in on a hit, only the signers count
+    signers = tuple(credentials.address.to_xdr() for credentials in _address_credentials(auth))
+    return contract_id, method, args, signers
+
+
+def _address_credentials(auth: List[SorobanAuthorizationEntry]):
+    return [
+        entry.credentials.address
+        for entry in auth
+        if entry.credentials.type == SorobanCredentialsType.SOROBAN_CREDENTIALS_ADDRESS
+    ]
+
+
+def _is_nonce_key(key: LedgerKey) -> bool:
+    return key.type == LedgerEntryType.CONTRACT_DATA and key.contract_data.key.type == SCValType.SCV_LEDGER_KEY_NONCE
+
+
+def _with_nonces(simulation, auth: List[SorobanAuthorizationEntry]):
+    """Copy a cached simulation with its nonce footprint entries replaced by those of `auth`."""
+    # each address credential consumes a temporary (address, nonce) entry; everything else in the
+    # footprint follows from the keyed arguments
+    data = SorobanTransactionData.from_xdr(simulation.transaction_data)
+    footprint = data.resources.footprint
+    footprint.read_write = [key for key in footprint.read_write if not _is_nonce_key(key)] + [
+        LedgerKey(
+            type=LedgerEntryType.CONTRACT_DATA,
+            contract_data=LedgerKeyContractData(
+                contract=credentials.address,
+                key=SCVal(type=SCValType.SCV_LEDGER_KEY_NONCE, nonce_key=SCNonceKey(credentials.nonce)),
+                durability=ContractDataDurability.TEMPORARY,
+            ),
+        )
+        for credentials in _address_credentials(auth)
+    ]
+    return simulation.model_copy(update={"transaction_data": data.to_xdr()})
+
+
+class RejectedEnvelope(ValueError):
+    """A client envelope or call the server account refuses to sign and pay for."""
+
+
+def _to_scval(arg) -> SCVal:
+    try:
+        encode = _SCVAL_DISPATCH[type(arg)]
+    except KeyError:
+        raise ValueError(f"Unsupported contract argument: {arg!r}") from None
+    return encode(arg)
+
+
+class SorobanAuthExecutor:
+    """Submits user-authorized Soroban calls with the resolver paying the fees.
+
+    Obtain it through get_instance() so the HTTP pool and the account/simulation caches are shared.
+    """
+
+    _instances: Dict[Tuple[Optional[str], str], "SorobanAuthExecutor"] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_instance(
+        cls, server_secret_key: Optional[str], network: str = "TESTNET", http: Optional[HttpxClient] = None
+    ) -> "SorobanAuthExecutor":
+        """Return the process-wide executor for a (secret, network) pair, creating it on first use."""
+        key = (server_secret_key, network.upper())
+        if key not in cls._instances:
+            with cls._lock:
+                if key not in cls._instances:
+                    cls._instances[key] = cls(server_secret_key, network, http=http)
+        return cls._instances[key]
+
+    def __init__(
+        self,
+        server_secret_key: Optional[str],
+        network: str = "TESTNET",
+        rpc_url: str = SOROBAN_RPC_URL,
+        http: Optional[HttpxClient] = None,
+    ):
+        self.server_keypair = Keypair.from_secret(server_secret_key) if server_secret_key else None
+        self._server_address = Address(self.server_keypair.public_key).to_xdr_sc_address() if self.server_keypair else None
+        self.network_passphrase = NETWORK_PASSPHRASES[network.upper()]
+        # every RPC goes through one keep-alive pool, shared with the caller when injected
+        self._http = http or HttpxClient()
+        self.server = SorobanServerAsync(rpc_url, client=self._http)
+        # sequence numbers are handed out locally and only reloaded when the network disagrees
+        self._account: Optional[Account] = None
+        self._account_lock = asyncio.Lock()
+        # submissions arriving close together share one send window and one poll loop
+        self._submissions: asyncio.Queue = asyncio.Queue()
+        self._batch_task: Optional[asyncio.Task] = None
+        # one poller walks every in-flight hash: tx hash -> (caller future, deadline)
+        self._pending: Dict[str, Tuple[asyncio.Future, float]] = {}
+        self._pending_added = False
+        self._poller_task: Optional[asyncio.Task] = None
+        # with many hashes in flight, a getTransactions scan replaces one getTransaction per hash;
+        # what a scan costs depends on network throughput, so the pages walked last time are kept
+        self._scan_supported = True
+        self._scan_pages = 1
+        self._scan_ledger: Optional[int] = None
+        self._scan_cursor: Optional[str] = None
+        self._sim_cache: TTLCache = TTLCache(maxsize=SIM_CACHE_SIZE, ttl=SIM_CACHE_TTL)
+        self.log = logging.getLogger("SorobanAuthExecutor")
+
+    async def execute_with_authorization(self, prepared_transaction_xdr: str, user_public_key: str) -> Dict[str, Any]:
+        """Co-sign and submit a transaction whose auth entries the user already signed."""
+        try:
+            self._require_keypair()
+            transaction = TransactionBuilder.from_xdr(prepared_transaction_xdr, self.network_passphrase)
+            # every accepted envelope ends up server-sourced, the batch worker signs it once its
+            # sequence is set
+            await self._take_over_source(transaction)
+            return await self._submit(transaction)
+        except Exception as e:
+            result = _error_result(e)
+            self.log.error("Authorized transaction for %s failed: %s", user_public_key, result["code"])
+            return result
+
+    async def execute_contract_call_with_auth(
+        self, user_public_key: str, contract_id: str, method: str, args: List, auth_signatures: List[str]
+    ) -> Dict[str, Any]:
+        """Build, simulate and submit a contract call carrying the user's signed auth entries."""
+        try:
+            self._require_keypair()
+            parameters = [_to_scval(arg) for arg in args]
+            auth = [SorobanAuthorizationEntry.from_xdr(entry) for entry in auth_signatures]
+            self._check_auth(auth)
+            # a cached simulation is only safe when the caller brings its own auth entries
+            shape = _simulation_key(contract_id, method, parameters, auth)
+            result, cached = await self._call_once(contract_id, method, parameters, auth, shape, use_cache=bool(auth))
+            if cached and result["status"] == "error":
+                self._sim_cache.pop(shape, None)
+                result, _ = await self._call_once(contract_id, method, parameters, auth, shape, use_cache=False)
+            return result
+        except Exception as e:
+            result = _error_result(e)
+            self.log.error("Contract call %s.%s for %s failed: %s", contract_id, method, user_public_key, result["code"])
+            return result
+
+    async def _submit(self, transaction) -> Dict[str, Any]:
+        """Queue an envelope for the batch worker and wait for its outcome."""
+        if self._batch_task is None:
+            self._batch_task = asyncio.create_task(self._batch_worker())
+        future = asyncio.get_running_loop().create_future()
+        await self._submissions.put((transaction, future))
+        return await future
+
+    async def _batch_worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._submissions.get()]
+            deadline = loop.time() + BATCH_WINDOW
+            while len(batch) < BATCH_MAX_SIZE and (remaining := deadline - loop.time()) > 0:
+                try:
+                    batch.append(await asyncio.wait_for(self._submissions.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await self._send_batch(batch)
+            except Exception as e:
+                self.log.error(f"Submitting a batch of {len(batch)} transactions failed: {e}")
+                for _, future in batch:
+                    _resolve(future, exception=e)
+
+    async def _send_batch(self, batch):
+        """Send a batch in one round-trip window, handing accepted hashes to the poller."""
+        # a source account only accepts consecutive sequence numbers, so each source sends in
+        # order while different sources go out concurrently
+        by_source: Dict[str, List] = {}
+        for transaction, future in batch:
+            by_source.setdefault(transaction.transaction.source.account_id, []).append((transaction, future))
+
+        async def send_in_order(items):
+            own = self.server_keypair is not None and items[0][0].transaction.source.account_id == self.server_keypair.public_key
+            if not own:
+                items = sorted(items, key=lambda item: item[0].transaction.sequence)
+            for transaction, future in items:
+                try:
+                    if own:
+                        # the sequence is taken right before signing, so the send order is the
+                        # sequence order no matter which caller finished simulating first
+                        transaction.transaction.sequence = (await self._next_source_account()).sequence + 1
+                        transaction.signatures = []
+                        transaction.sign(self.server_keypair)
+                    response = await self.server.send_transaction(transaction)
+                except Exception as e:
+                    if own:
+                        # unknown whether the sequence number reached the network, resync
+                        self._account = None
+                    _resolve(future, exception=e)
+                    continue
+                if response.status in _ACCEPTED:
+                    self._track(response.hash, future, response.latest_ledger)
+                    continue
+                # ERROR or TRY_AGAIN_LATER: the envelope never consumed its sequence number, resync
+                if own:
+                    self._account = None
+                if response.status == SendTransactionStatus.TRY_AGAIN_LATER:
+                    _resolve(future, {
+                        "status": "error", "code": "try_again_later", "error": "Soroban RPC is congested", "hash": response.hash
+                    })
+                else:
+                    _resolve(future, {"status": "error", "error": response.error_result_xdr, "hash": response.hash})
+
+        await asyncio.gather(*(send_in_order(items) for items in by_source.values()))
+
+    async def _take_over_source(self, envelope):
+        """Make the server account the fee source of a client-prepared envelope, in place.
+
+        Only a single contract invocation acting through the envelope source is sponsored: any
+        other operation, one with its own source, or auth through the server account itself
+        would run against the server account.
+        """
+        if not isinstance(envelope, TransactionEnvelope):
+            raise RejectedEnvelope("fee bump envelopes are not sponsored")
+        tx = envelope.transaction
+        if len(tx.operations) != 1 or not isinstance(tx.operations[0], InvokeHostFunction):
+            raise RejectedEnvelope("only a single InvokeHostFunction operation is sponsored")
+        if tx.operations[0].source is not None:
+            raise RejectedEnvelope("sponsored operations cannot set their own source")
+        if tx.fee > MAX_SPONSORED_FEE:
+            raise RejectedEnvelope(f"fee {tx.fee} exceeds the sponsored maximum of {MAX_SPONSORED_FEE}")
+        # the server is or becomes the source either way: source-account credentials would then
+        # authorize as the server (and cannot be kept for a user source the server co-signs)
+        self._check_auth(tx.operations[0].auth)
+        tx.fee = max(tx.fee, MIN_SPONSORED_FEE)
+        if tx.source.account_id == self.server_keypair.public_key:
+            return
+        # only the source (and a fee under the floor) change here and the batch worker sets the
+        # sequence: operations, memo, preconditions and the resource fee stay as the client set them
+        tx.source = MuxedAccount(self.server_keypair.public_key)
+        # envelope signatures covered the old payload, the server signature replaces them
+        envelope.signatures = []
+
+    async def _call_once(self, contract_id, method, parameters, auth, shape, use_cache: bool):
+        """Build, prepare and submit one invocation; also reports whether a cached simulation was used."""
+        # simulation does not depend on the sequence number: build against a placeholder account,
+        # the batch worker stamps the real sequence and signs at send time
+        transaction = (
+            TransactionBuilder(
+                source_account=Account(self.server_keypair.public_key, 0),
+                network_passphrase=self.network_passphrase,
+                base_fee=100,
+            )
+            .append_invoke_contract_function_op(
+                contract_id=contract_id,
+                function_name=method,
+                parameters=parameters,
+                auth=auth or None,
+            )
+            .set_timeout(30)
+            .build()
+        )
+        # a cold account cache loads while the simulation is in flight; nothing is reserved here
+        loaded, simulated = await asyncio.gather(
+            self._load_account(), self._simulate(transaction, shape, auth, use_cache), return_exceptions=True
+        )
+        # both legs have finished here, so a failure cannot race the account cache reset
+        for outcome in (loaded, simulated):
+            if isinstance(outcome, BaseException):
+                raise outcome
+        simulation, cached = simulated
+        # assembling from a given simulation is local, prepare_transaction only simulates when it has none
+        prepared = await self.server.prepare_transaction(transaction, simulation)
+        # with no client entries the simulation fills in whatever the call needs, which for a
+        # call moving the server's own funds is the server's source-account authorization
+        self._check_auth(prepared.transaction.operations[0].auth)
+        if prepared.transaction.fee > MAX_SPONSORED_FEE:
+            raise RejectedEnvelope(f"fee {prepared.transaction.fee} exceeds the sponsored maximum of {MAX_SPONSORED_FEE}")
+        return await self._submit(prepared), cached
+
+    async def _simulate(self, transaction, shape, auth, use_cache: bool):
+        simulation = self._sim_cache.get(shape) if use_cache else None
+        if simulation is not None:
+            return _with_nonces(simulation, auth), True
+        simulation = await self.server.simulate_transaction(transaction)
+        if simulation.error is None:
+            self._sim_cache[shape] = simulation
+        return simulation, False
+
+    def _track(self, tx_hash: str, future: asyncio.Future, submitted_ledger: int):
+        """Hand a submitted hash to the shared poller, starting it if it is idle."""
+        self._pending[tx_hash] = (future, asyncio.get_running_loop().time() + CONFIRMATION_TIMEOUT)
+        self._pending_added = True
+        if self._scan_cursor is None:
+            self._scan_ledger = min(self._scan_ledger or submitted_ledger, submitted_ledger)
+        if self._poller_task is None or self._poller_task.done():
+            self._poller_task = asyncio.create_task(self._poll_pending())
+
+    async def _poll_pending(self):
+        """Settle every in-flight hash once per tick; exits once nothing is pending."""
+        loop = asyncio.get_running_loop()
+        attempt = 0
+        while self._pending:
+            if self._pending_added:
+                # fresh hashes most likely land within a ledger, go back to dense polling
+                attempt = 0
+                self._pending_added = False
+            if self._scan_supported and len(self._pending) >= max(SCAN_MIN_PENDING, self._scan_pages * SCAN_PAGE_COST):
+                transport_error = await self._settle_by_scan()
+            else:
+                transport_error = await self._settle_by_hash()
+            now = loop.time()
+            for tx_hash in [h for h, (_, deadline) in self._pending.items() if deadline <= now]:
+                _resolve(self._pending.pop(tx_hash)[0], {
+                    "status": "error", "error": f"Transaction {tx_hash} not confirmed in {CONFIRMATION_TIMEOUT}s", "hash": tx_hash
+                })
+            if not self._pending:
+                break
+            if transport_error:
+                await asyncio.sleep(CONFIRMATION_RETRY_DELAY)
+                continue
+            delay = min(CONFIRMATION_BACKOFF_MAX, CONFIRMATION_BACKOFF_MIN * 1.5 ** attempt)
+            await asyncio.sleep(delay + random.uniform(0, 0.05))
+            attempt += 1
+        self._scan_ledger = None
+        self._scan_cursor = None
+
+    async def _settle_by_hash(self) -> bool:
+        hashes = list(self._pending)
+        results = await asyncio.gather(
+            *(self.server.get_transaction(tx_hash) for tx_hash in hashes), return_exceptions=True
+        )
+        transport_error = False
+        latest_ledger = None
+        for tx_hash, result in zip(hashes, results):
+            if isinstance(result, ConnectionError):
+                self.log.warning(f"Polling {tx_hash} failed, retrying: {result}")
+                transport_error = True
+            elif isinstance(result, Exception):
+                _resolve(self._pending.pop(tx_hash)[0], exception=result)
+            else:
+                self._settle(tx_hash, result.status.value, result.ledger, result.result_xdr)
+                latest_ledger = result.latest_ledger if latest_ledger is None else min(latest_ledger, result.latest_ledger)
+        if not transport_error and latest_ledger is not None:
+            # whatever is still pending had not landed by this ledger, a later scan starts there
+            self._scan_ledger = latest_ledger
+            self._scan_cursor = None
+        return transport_error
+
+    async def _settle_by_scan(self) -> bool:
+        """Walk newly closed ledgers with getTransactions; one paged read covers every pending hash."""
+        pages = 0
+        try:
+            while True:
+                if self._scan_cursor is None:
+                    page = await self.server.get_transactions(start_ledger=self._scan_ledger, limit=SCAN_PAGE_LIMIT)
+                else:
+                    page = await self.server.get_transactions(cursor=self._scan_cursor, limit=SCAN_PAGE_LIMIT)
+                pages += 1
+                for tx in page.transactions:
+                    if tx.transaction_hash in self._pending:
+                        self._settle(tx.transaction_hash, tx.status, tx.ledger, tx.result_xdr)
+                self._scan_cursor = page.cursor
+                if len(page.transactions) < SCAN_PAGE_LIMIT or not self._pending:
+                    self._scan_pages = pages
+                    return False
+        except ConnectionError as e:
+            self.log.warning(f"Scanning transactions failed, retrying: {e}")
+            return True
+        except SorobanRpcErrorResponse as e:
+            if e.code == RPC_METHOD_NOT_FOUND:
+                self.log.warning("getTransactions unavailable, polling by hash")
+                self._scan_supported = False
+            else:
+                # e.g. a start ledger pruned from retention: per-hash polling moves the scan start forward
+                self.log.warning("Scanning transactions failed, polling by hash this tick: %s", e.message)
+        except Exception as e:
+            self.log.warning("Scanning transactions failed, polling by hash this tick: %s", type(e).__name__)
+        self._scan_pages = max(self._scan_pages, pages)
+        return await self._settle_by_hash()
+
+    def _settle(self, tx_hash: str, status: str, ledger: Optional[int], result_xdr: Optional[str]):
+        if status == GetTransactionStatus.SUCCESS.value:
+            _resolve(self._pending.pop(tx_hash)[0], {
+                "status": "success", "hash": tx_hash, "ledger": ledger, "result_xdr": result_xdr
+            })
+        elif status == GetTransactionStatus.FAILED.value:
+            _resolve(self._pending.pop(tx_hash)[0], {"status": "error", "error": result_xdr, "hash": tx_hash})
+
+    async def _load_account(self):
+        """Fill the server account cache if it is empty."""
+        if self._account is None:
+            async with self._account_lock:
+                if self._account is None:
+                    self._account = await self.server.load_account(self.server_keypair.public_key)
+
+    async def _next_source_account(self) -> Account:
+        """Hand out a copy of the cached server account and bump the cached sequence."""
+        async with self._account_lock:
+            if self._account is None:
+                self._account = await self.server.load_account(self.server_keypair.public_key)
+            # the builder consumes sequence + 1 from the copy, the cache moves past it
+            source = Account(self._account.account, self._account.sequence)
+            self._account.increment_sequence_number()
+            return source
+
+    def _check_auth(self, entries):
+        """Refuse auth entries through which the server account itself would authorize the call."""
+        for entry in entries or ():
+            credentials = entry.credentials
+            if credentials.type == SorobanCredentialsType.SOROBAN_CREDENTIALS_SOURCE_ACCOUNT:
+                raise RejectedEnvelope("source-account authorization is not sponsored")
+            if credentials.address is not None and credentials.address.address == self._server_address:
+                raise RejectedEnvelope("auth entries cannot name the server account")
+
+    def _require_keypair(self):
+        if self.server_keypair is None:
+            raise ValueError("STELLAR_SECRET is not set")
+
+    async def aclose(self):
+        for task in (self._batch_task, self._poller_task):
+            if task is not None:
+                task.cancel()
+        await self._http.close()
+
+
+def _resolve(future: asyncio.Future, result: Any = None, exception: Optional[BaseException] = None):
+    # the caller may have gone away (request cancelled) before its transaction settled
+    if future.done():
+        return
+    if exception is not None:
+        future.set_exception(exception)
+    else:
+        future.set_result(result)
+
+
+def _error_result(e: Exception) -> Dict[str, Any]:
+    """Map a failure to a fixed error code, reading only the fields each known exception carries."""
+    # str() of SDK errors renders the whole HTTP response or simulation, keep that off the request path
+    if isinstance(e, RejectedEnvelope):
+        return {"status": "error", "code": "rejected_envelope", "error": str(e)}
+    if isinstance(e, Ed25519SecretSeedInvalidError):
+        return {"status": "error", "code": "invalid_secret", "error": "invalid server secret key"}
+    if isinstance(e, BadRequestError):
+        return {"status": "error", "code": "bad_request", "http_status": e.status, "error": e.message[:ERROR_MESSAGE_LIMIT]}
+    if isinstance(e, SorobanRpcErrorResponse):
+        return {"status": "error", "code": "rpc_error", "rpc_code": e.code, "error": (e.message or "")[:ERROR_MESSAGE_LIMIT]}
+    if isinstance(e, PrepareTransactionException):
+        return {"status": "error", "code": "simulation_failed", "error": e.message[:ERROR_MESSAGE_LIMIT]}
+    if isinstance(e, ConnectionError):
+        return {"status": "error", "code": "connection_error", "error": "Soroban RPC unreachable"}
+    if isinstance(e, asyncio.TimeoutError):
+        return {"status": "error", "code": "timeout", "error": "timed out waiting for Soroban RPC"}
+    return {"status": "error", "code": "internal_error", "error": str(e)[:ERROR_MESSAGE_LIMIT]}
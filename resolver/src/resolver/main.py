@@ -1,16 +1,20 @@
 from contextlib import asynccontextmanager
 import asyncio, logging, os
 import dotenv
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import ORJSONResponse
 from rich.logging import RichHandler
+import msgspec
 import uvicorn
 from typing import List, Optional
 from .soroban import *
+from .auth_executor import SorobanAuthExecutor
+from .http_client import HttpxClient
+from .models import *
 from decimal import *
 import stellar_sdk
-from stellar_sdk import Keypair, Network, SorobanServer, TransactionBuilder
+from stellar_sdk import Keypair, Network, SorobanServerAsync, TransactionBuilder
 from stellar_sdk.xdr import (
     SCVal, SCValType, SCAddress, SCAddressType,
     SorobanAuthorizationEntry, SorobanCredentials, SorobanCredentialsType,
@@ -27,8 +31,35 @@ stellar_resolver_secret = os.getenv("STELLAR_RESOLVER_SECRET")
 stellar_swapper_address = os.getenv("STELLAR_SWAPPER_ADDRESS")
 stellar_swapper_secret = os.getenv("STELLAR_SWAPPER_SECRET")
 
-horizon_server = Server("https://horizon-testnet.stellar.org")
-soroban_server = SorobanServer("https://soroban-testnet.stellar.org")
+# Soroban RPC and the executor share one pooled HTTP/2 client
+http_client = HttpxClient()
+soroban_server = SorobanServerAsync("https://soroban-testnet.stellar.org", client=http_client)
+soroban_executor = SorobanAuthExecutor.get_instance(
+    server_secret_key=os.getenv("STELLAR_SECRET"),
+    network=os.getenv("STELLAR_NETWORK", "TESTNET"),
+    http=http_client,
+)
+
+# env-derived addresses never change, so their SCVals are built once
+_FACTORY_XDR = address_to_scval(stellar_escrow_factory_address) if stellar_escrow_factory_address else None
+_RESOLVER_XDR = address_to_scval(stellar_resolver_address) if stellar_resolver_address else None
+
+# immutable parts of the create_escrow auth entry, shared across orders
+_CREATE_ESCROW_FN_NAME = SCString(b"create_escrow")
+_VOID_SIG = SCVal(type=SCValType.SCV_VOID)
+_CONTRACT_FN_TYPE = SorobanAuthorizedFunctionType.SOROBAN_AUTHORIZED_FUNCTION_TYPE_CONTRACT_FN
+_ADDRESS_CREDENTIALS_TYPE = SorobanCredentialsType.SOROBAN_CREDENTIALS_ADDRESS
+
+def _new_tx_builder(source_account) -> TransactionBuilder:
+    return TransactionBuilder(
+        source_account=source_account,
+        network_passphrase=stellar_network_passphrase,
+        base_fee=100
+    )
+
+_SECRET_HASH = hashlib.sha256(b'secret').digest()
+_TIMELOCK_KEYS = ("withdrawal", "public_withdrawal", "cancellation", "public_cancellation")
+_TIMELOCK_OFFSETS = (86400, 172800, 259200, 345600)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -49,24 +80,26 @@ async def lifespan(app: FastAPI):
     except Exception as _:
         pass
     finally:
-        pass
+        await soroban_executor.aclose()
+
+def msgspec_body(model):
+    """Decode the request body straight into a msgspec Struct, bypassing per-field pydantic validation."""
+    decoder = msgspec.json.Decoder(model)
+
+    async def decode(request: Request):
+        try:
+            return decoder.decode(await request.body())
+        except msgspec.DecodeError as e:
+            raise HTTPException(status_code=422, detail=str(e))
 
-app = FastAPI(lifespan=lifespan)
+    return decode
+
+# executor results and order echoes are plain dicts, serialize them with orjson
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 origins = [
     "*",
 ]
 
-class SorobanTransactionRequest(BaseModel):
-    prepared_transaction_xdr: str
-    user_public_key: str
-
-class SorobanContractCallRequest(BaseModel):
-    user_public_key: str
-    contract_id: str
-    method: str
-    args: List
-    auth_signatures: Optional[List] = None
-
 @app.post("/execute-authorized-soroban-transaction")
 async def execute_authorized_soroban_transaction(request: SorobanTransactionRequest):
     """
@@ -112,38 +145,23 @@ async def execute_soroban_contract_call(request: SorobanContractCallRequest):
 async def health_check():
     return {"status": "healthy"}
 
-class Wallet(BaseModel):
-    network: str
-    address: str
-    token: str
-
-class DutchAuction(BaseModel):
-    start_time: int
-    start_multiplier: Decimal
-    stop_time: int
-    stop_multiplier: Decimal
-
-class Order(BaseModel):
-    hashlock: str
-    src_wallet: Wallet
-    src_amount: Decimal
-    dst_wallet: Wallet
-    dst_amount: Decimal
-    auction: Optional[DutchAuction]
-
-class MakingAuth(BaseModel):
-    pass
+@app.get("/debug/cache")
+async def cache_stats():
+    return {
+        "address_to_scval": address_to_scval.cache_info()._asdict(),
+        "sc_address_from_str": sc_address_from_str.cache_info()._asdict(),
+    }
 
 @app.post("/order")
-async def process_order(order: Order):
+async def process_order(order: Order = Depends(msgspec_body(Order))):
     # Handle order processing
     match (order.src_wallet.network, order.dst_wallet.network):
         case ("Ethereum", "Stellar"):
             # Solidity maker-to-taker
 
             # Soroban taker-to-maker
-            contract_address_xdr = address_to_scval(stellar_escrow_factory_address)
-            auth_address_xdr = address_to_scval(stellar_resolver_address)
+            contract_address_xdr = _FACTORY_XDR
+            auth_address_xdr = _RESOLVER_XDR
 
             amount_val = \
                 encode_amount_calc_flat(int(order.dst_amount)) \
@@ -157,15 +175,11 @@ async def process_order(order: Order):
                     int(order.dst_amount * order.auction.stop_multiplier)
                 )
 
-            timelocks_data = {
-                "withdrawal": int(time.time()) + 86400,
-                "public_withdrawal": int(time.time()) + 172800,
-                "cancellation": int(time.time()) + 259200,
-                "public_cancellation": int(time.time()) + 345600
-            }
+            now = int(time.time())
+            timelocks_data = dict(zip(_TIMELOCK_KEYS, (now + o for o in _TIMELOCK_OFFSETS)))
 
             immutables_xdr = encode_escrow_immutables(
-                hashlib.sha256(b'secret').digest(),
+                _SECRET_HASH,
                 "Taker2Maker",
                 order.dst_wallet.address,
                 None,
@@ -177,26 +191,26 @@ async def process_order(order: Order):
             # Create function arguments
             args = [
                 immutables_xdr,
-                address_to_scval(stellar_resolver_address)
+                _RESOLVER_XDR
             ]
 
             # Create authorization entry
             auth_entry = SorobanAuthorizationEntry(
                 credentials=SorobanCredentials(
-                    type=SorobanCredentialsType.SOROBAN_CREDENTIALS_ADDRESS,
+                    type=_ADDRESS_CREDENTIALS_TYPE,
                     address=SorobanAddressCredentials(
                         address=auth_address_xdr,
                         nonce=stellar_sdk.xdr.Int64(123),
                         signature_expiration_ledger=stellar_sdk.xdr.Uint32(100),
-                        signature=SCVal(type=SCValType.SCV_VOID)
+                        signature=_VOID_SIG
                     )
                 ),
                 root_invocation=SorobanAuthorizedInvocation(
                     function=SorobanAuthorizedFunction(
-                        type=SorobanAuthorizedFunctionType.SOROBAN_AUTHORIZED_FUNCTION_TYPE_CONTRACT_FN,
+                        type=_CONTRACT_FN_TYPE,
                         contract_fn=InvokeContractArgs(
                             contract_address=contract_address_xdr,
-                            function_name=SCString(b"create_escrow"),
+                            function_name=_CREATE_ESCROW_FN_NAME,
                             args=args
                         )
                     ),
@@ -205,14 +219,10 @@ async def process_order(order: Order):
             )
 
             # Build transaction
-            source_account = soroban_server.load_account(stellar_resolver_address)
+            source_account = await soroban_server.load_account(stellar_resolver_address)
             
             transaction = (
-                TransactionBuilder(
-                    source_account=source_account,
-                    network_passphrase=stellar_network_passphrase,
-                    base_fee=100
-                )
+                _new_tx_builder(source_account)
                 .append_invoke_contract_function_op(
                     contract_id=stellar_escrow_factory_address,
                     function_name="create_escrow",
@@ -225,14 +235,14 @@ async def process_order(order: Order):
 
             # Prepare and simulate transaction
             try:
-                prepared_transaction = soroban_server.prepare_transaction(transaction)
+                prepared_transaction = await soroban_server.prepare_transaction(transaction)
             except stellar_sdk.exceptions.PrepareTransactionException as pte:
                 print(pte)
                 raise
             
             # Sign and submit
             prepared_transaction.sign(source_keypair)
-            response = soroban_server.send_transaction(prepared_transaction)
+            response = await soroban_server.send_transaction(prepared_transaction)
             
             # Parse result (equivalent to assert_eq!(r, 2))
             if response.status == "SUCCESS":
@@ -251,15 +261,12 @@ async def process_order(order: Order):
             pass
         case _:
             return {"status": "failure", "cause": "Unsupported exchange direction"}
-    return {"status": "success", "order": order}
-
-class Secret(BaseModel):
-    value: str
+    return {"status": "success", "order": msgspec.to_builtins(order)}
 
 @app.post("/secret")
-async def create_secret(secret: Secret):
+async def create_secret(secret: Secret = Depends(msgspec_body(Secret))):
     # Handle secret creation
-    return {"status": "success", "secret": secret}
+    return {"status": "success", "secret": msgspec.structs.asdict(secret)}
 
 app.add_middleware(
     CORSMiddleware,
@@ -271,4 +278,12 @@ app.add_middleware(
 
 if __name__ == "__main__":
     port = int(os.getenv("PORT", "4000"))
-    uvicorn.run("src.resolver.main:app", host="0.0.0.0", port=port, reload=True)
+    uvicorn.run(
+        "src.resolver.main:app",
+        host="0.0.0.0",
+        port=port,
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("WORKERS", "1")),
+        reload=bool(int(os.getenv("RELOAD", "0"))),
+    )
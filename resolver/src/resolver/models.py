@@ -0,0 +1,40 @@
+from decimal import Decimal
+from typing import List, Optional
+import msgspec
+from pydantic import BaseModel
+
+class SorobanTransactionRequest(BaseModel):
+    prepared_transaction_xdr: str
+    user_public_key: str
+
+class SorobanContractCallRequest(BaseModel):
+    user_public_key: str
+    contract_id: str
+    method: str
+    args: List
+    auth_signatures: Optional[List] = None
+
+class Wallet(msgspec.Struct, frozen=True):
+    network: str
+    address: str
+    token: str
+
+class DutchAuction(msgspec.Struct):
+    start_time: int
+    start_multiplier: Decimal
+    stop_time: int
+    stop_multiplier: Decimal
+
+class Order(msgspec.Struct):
+    hashlock: str
+    src_wallet: Wallet
+    src_amount: Decimal
+    dst_wallet: Wallet
+    dst_amount: Decimal
+    auction: Optional[DutchAuction]
+
+class MakingAuth(msgspec.Struct):
+    pass
+
+class Secret(msgspec.Struct, frozen=True):
+    value: str
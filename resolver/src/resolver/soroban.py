@@ -1,3 +1,4 @@
+import functools
 import hashlib
 import time
 from stellar_sdk import *
@@ -8,29 +9,32 @@ from stellar_sdk.xdr import *
 def make_bytes32(hex_or_bytes):
     return Hash(HashID.from_hex(hex_or_bytes) if isinstance(hex_or_bytes, str) else HashID(hex_or_bytes))
 
+# maker, token and contract addresses repeat across orders; SCVals are never mutated once built
+@functools.lru_cache(maxsize=4096)
 def sc_address_from_str(address: str) -> SCAddress:
-    if StrKey.is_valid_ed25519_public_key(address):
-        return SCAddress(
-            type=SCAddressType.SC_ADDRESS_TYPE_ACCOUNT,
-            account_id=Uint256(StrKey.decode_ed25519_public_key(address)),
-        )
-    elif StrKey.is_valid_contract(address):
-        return SCAddress(
-            type=SCAddressType.SC_ADDRESS_TYPE_CONTRACT,
-            contract_id=Hash(StrKey.decode_contract(address)),
-        )
-    raise ValueError("Invalid address format")
-
+    # Address tells accounts (G) from contracts (C), verifies the checksum and wraps an account
+    # key in AccountID/PublicKey as the XDR union requires
+    try:
+        return Address(address).to_xdr_sc_address()
+    except ValueError:
+        raise ValueError("Invalid address format") from None
+
+@functools.lru_cache(maxsize=4096)
 def address_to_scval(address: str) -> SCVal:
     return SCVal(
         type=SCValType.SCV_ADDRESS,
         address=sc_address_from_str(address)
     )
 
+_U128_MASK = (1 << 128) - 1
+_SIGN_BIT = 1 << 63
+
 def i128_to_scval(n: int) -> SCVal:
+    # one divmod of the two's-complement value gives both halves; hi is re-signed for Int64
+    hi, lo = divmod(n & _U128_MASK, 1 << 64)
     return SCVal(
         type=SCValType.SCV_I128,
-        i128=Int128Parts(hi=Int64((n >> 64) & 0xFFFFFFFFFFFFFFFF), lo=Uint64(n & 0xFFFFFFFFFFFFFFFF)),
+        i128=Int128Parts(hi=Int64(hi - (1 << 64) if hi & _SIGN_BIT else hi), lo=Uint64(lo)),
     )
 
 def u64_to_scval(n: int) -> SCVal:
@@ -42,12 +46,16 @@ def bytes_to_sc_bytes(data: bytes) -> SCVal:
         bytes=SCBytes(data),
     )
 
-def symbol_to_scval(sym: str) -> SCVal:
+@functools.lru_cache(maxsize=256)
+def _sym(s: str) -> SCVal:
     return SCVal(
         type=SCValType.SCV_SYMBOL,
-        sym=SCSymbol(sym.encode("utf-8")),
+        sym=SCSymbol(s.encode("utf-8")),
     )
 
+def symbol_to_scval(sym: str) -> SCVal:
+    return _sym(sym)
+
 def map_to_scval(pairs: list[tuple[SCVal, SCVal]]) -> SCVal:
     return SCVal(
         type=SCValType.SCV_MAP,
@@ -67,42 +75,70 @@ def enum_to_tuple_variant(tag_name: str, payload: SCVal=None) -> SCVal:
 
     return vec_to_scval(inner_vec)
 
+_SCV_VOID = SCVal(type=SCValType.SCV_VOID)
+
 def option_to_scval(value) -> SCVal:
     """Convert optional value to SCVal (None or Some(value))"""
-    if value is None:
-        return SCVal(type=SCValType.SCV_VOID)
-    else:
-        return value
+    return _SCV_VOID if value is None else value
 
 # --- Custom Type Constructs ---
 
+# field and variant names are a fixed alphabet, build their symbols once.
+# Soroban reads contracttype structs as maps whose keys must be in byte order
+# and the SDK does not sort raw SCMaps, so the encoders list entries pre-sorted.
+_SYM_WITHDRAWAL = _sym("withdrawal")
+_SYM_PUB_WITHDRAWAL = _sym("public_withdrawal")
+_SYM_CANCELLATION = _sym("cancellation")
+_SYM_PUB_CANCELLATION = _sym("public_cancellation")
+_SYM_START_TIME = _sym("start_time")
+_SYM_STOP_TIME = _sym("stop_time")
+_SYM_START_AMOUNT = _sym("start_amount")
+_SYM_STOP_AMOUNT = _sym("stop_amount")
+_SYM_HASHLOCK = _sym("hashlock")
+_SYM_DIRECTION = _sym("direction")
+_SYM_MAKER = _sym("maker")
+_SYM_TOKEN = _sym("token")
+_SYM_AMOUNT = _sym("amount")
+_SYM_SAFETY_DEPOSIT = _sym("safety_deposit")
+_SYM_TIMELOCKS = _sym("timelocks")
+_SYM_FLAT = _sym("Flat")
+_SYM_LINEAR = _sym("Linear")
+_SYM_M2T = _sym("Maker2Taker")
+_SYM_T2M = _sym("Taker2Maker")
+_DIR_M2T = vec_to_scval([_SYM_M2T])
+_DIR_T2M = vec_to_scval([_SYM_T2M])
+_DIRS = {"Maker2Taker": _DIR_M2T, "Taker2Maker": _DIR_T2M}
+
 def encode_amount_calc_flat(amount: int):
-    return enum_to_tuple_variant("Flat", i128_to_scval(amount))
+    return vec_to_scval([_SYM_FLAT, i128_to_scval(amount)])
 
 
 def encode_amount_calc_linear(start_time, stop_time, start_amount, stop_amount):
     params = SCMap([
-        SCMapEntry(key=symbol_to_scval("start_time"), val=u64_to_scval(start_time)),
-        SCMapEntry(key=symbol_to_scval("stop_time"), val=u64_to_scval(stop_time)),
-        SCMapEntry(key=symbol_to_scval("start_amount"), val=i128_to_scval(start_amount)),
-        SCMapEntry(key=symbol_to_scval("stop_amount"), val=i128_to_scval(stop_amount)),
+        SCMapEntry(key=_SYM_START_AMOUNT, val=i128_to_scval(start_amount)),
+        SCMapEntry(key=_SYM_START_TIME, val=u64_to_scval(start_time)),
+        SCMapEntry(key=_SYM_STOP_AMOUNT, val=i128_to_scval(stop_amount)),
+        SCMapEntry(key=_SYM_STOP_TIME, val=u64_to_scval(stop_time)),
     ])
     payload = SCVal(type=SCValType.SCV_MAP, map=params)
-    return enum_to_tuple_variant("Linear", payload)
+    return vec_to_scval([_SYM_LINEAR, payload])
 
 
 def encode_timelocks(withdrawal, public_withdrawal, cancellation, public_cancellation):
     return map_to_scval([
-        SCMapEntry(key=symbol_to_scval("withdrawal"), val=u64_to_scval(withdrawal)),
-        SCMapEntry(key=symbol_to_scval("public_withdrawal"), val=u64_to_scval(public_withdrawal)),
-        SCMapEntry(key=symbol_to_scval("cancellation"), val=u64_to_scval(cancellation)),
-        SCMapEntry(key=symbol_to_scval("public_cancellation"), val=u64_to_scval(public_cancellation)),
+        SCMapEntry(key=_SYM_CANCELLATION, val=u64_to_scval(cancellation)),
+        SCMapEntry(key=_SYM_PUB_CANCELLATION, val=u64_to_scval(public_cancellation)),
+        SCMapEntry(key=_SYM_PUB_WITHDRAWAL, val=u64_to_scval(public_withdrawal)),
+        SCMapEntry(key=_SYM_WITHDRAWAL, val=u64_to_scval(withdrawal)),
     ])
 
 
+_ZERO_TIMELOCKS = encode_timelocks(0, 0, 0, 0)
+
+
 def encode_escrow_direction(enum_val: str):
-    assert enum_val in ["Maker2Taker", "Taker2Maker"]
-    return enum_to_tuple_variant(enum_val)
+    assert enum_val in _DIRS
+    return _DIRS[enum_val]
 
 
 def encode_escrow_immutables(
@@ -115,15 +151,13 @@ def encode_escrow_immutables(
     timelocks: dict,
 ):
     entries = [
-        SCMapEntry(key=symbol_to_scval("hashlock"), val=bytes_to_sc_bytes(hashlock)),
-        SCMapEntry(key=symbol_to_scval("direction"), val=encode_escrow_direction(direction)),
-        SCMapEntry(key=symbol_to_scval("maker"), val=address_to_scval(maker)),
-        SCMapEntry(key=symbol_to_scval("token"), val=option_to_scval(
-            address_to_scval(token) if token is not None else None
-        )),
-        SCMapEntry(key=symbol_to_scval("amount"), val=amount),
-        SCMapEntry(key=symbol_to_scval("safety_deposit"), val=i128_to_scval(safety_deposit)),
-        SCMapEntry(key=symbol_to_scval("timelocks"), val=encode_timelocks(**timelocks) if timelocks else encode_timelocks(0, 0, 0, 0)),
+        SCMapEntry(key=_SYM_AMOUNT, val=amount),
+        SCMapEntry(key=_SYM_DIRECTION, val=encode_escrow_direction(direction)),
+        SCMapEntry(key=_SYM_HASHLOCK, val=bytes_to_sc_bytes(hashlock)),
+        SCMapEntry(key=_SYM_MAKER, val=address_to_scval(maker)),
+        SCMapEntry(key=_SYM_SAFETY_DEPOSIT, val=i128_to_scval(safety_deposit)),
+        SCMapEntry(key=_SYM_TIMELOCKS, val=encode_timelocks(**timelocks) if timelocks else _ZERO_TIMELOCKS),
+        SCMapEntry(key=_SYM_TOKEN, val=_SCV_VOID if token is None else address_to_scval(token)),
     ]
     
     return map_to_scval(entries)
\ No newline at end of file
@@ -0,0 +1,264 @@
+import asyncio
+
+import pytest
+from stellar_sdk import Account, Address, Keypair, Network, TransactionBuilder
+from stellar_sdk.soroban_rpc import SendTransactionStatus, SimulateTransactionResponse
+from stellar_sdk.xdr import (
+    ContractDataDurability,
+    ExtensionPoint,
+    Int64,
+    InvokeContractArgs,
+    LedgerEntryType,
+    LedgerFootprint,
+    LedgerKey,
+    LedgerKeyContractData,
+    SCNonceKey,
+    SCSymbol,
+    SCVal,
+    SCValType,
+    SorobanAddressCredentials,
+    SorobanAuthorizationEntry,
+    SorobanAuthorizedFunction,
+    SorobanAuthorizedFunctionType,
+    SorobanAuthorizedInvocation,
+    SorobanCredentials,
+    SorobanCredentialsType,
+    SorobanResources,
+    SorobanTransactionData,
+    Uint32,
+)
+
+from resolver.auth_executor import SorobanAuthExecutor, _to_scval
+
+TOKEN = "CDLZFC3SYJYDZT7K67VZ75HPJVIEUVNIXF47ZG2FB2RMQQVU2HHGCYSC"
+
+
+class FakeRpc:
+    """Stands in for the network side of SorobanServerAsync; assembling stays the SDK's."""
+
+    def __init__(self, executor, simulation=None):
+        self.simulation = simulation
+        self.simulations = 0
+        self.sent = []
+        executor.server.load_account = self.load_account
+        executor.server.simulate_transaction = self.simulate_transaction
+        executor.server.send_transaction = self.send_transaction
+        executor._track = lambda tx_hash, future, ledger: future.set_result({"status": "success", "hash": tx_hash})
+
+    async def load_account(self, account_id):
+        return Account(account_id, 100)
+
+    async def simulate_transaction(self, transaction):
+        self.simulations += 1
+        return self.simulation
+
+    async def send_transaction(self, envelope):
+        self.sent.append(envelope)
+
+        class Response:
+            status = SendTransactionStatus.PENDING
+            hash = envelope.hash_hex()
+            latest_ledger = 10
+
+        return Response()
+
+
+def source_account_transfer_auth(to: str) -> SorobanAuthorizationEntry:
+    """The entry recording-mode simulation returns for a transfer out of the envelope source."""
+    return SorobanAuthorizationEntry(
+        credentials=SorobanCredentials(SorobanCredentialsType.SOROBAN_CREDENTIALS_SOURCE_ACCOUNT),
+        root_invocation=SorobanAuthorizedInvocation(
+            function=SorobanAuthorizedFunction(
+                SorobanAuthorizedFunctionType.SOROBAN_AUTHORIZED_FUNCTION_TYPE_CONTRACT_FN,
+                contract_fn=InvokeContractArgs(
+                    Address(TOKEN).to_xdr_sc_address(), SCSymbol(b"transfer"), [Address(to).to_xdr_sc_val()]
+                ),
+            ),
+            sub_invocations=[],
+        ),
+    )
+
+
+def user_transfer_auth(user: str, to: str, nonce: int) -> SorobanAuthorizationEntry:
+    """A signed-by-the-user entry for a transfer out of the user's balance."""
+    return SorobanAuthorizationEntry(
+        credentials=SorobanCredentials(
+            SorobanCredentialsType.SOROBAN_CREDENTIALS_ADDRESS,
+            address=SorobanAddressCredentials(
+                Address(user).to_xdr_sc_address(), Int64(nonce), Uint32(1000), SCVal(SCValType.SCV_VOID)
+            ),
+        ),
+        root_invocation=source_account_transfer_auth(to).root_invocation,
+    )
+
+
+def contract_data_key(contract: str, key: SCVal, durability=ContractDataDurability.PERSISTENT) -> LedgerKey:
+    return LedgerKey(
+        type=LedgerEntryType.CONTRACT_DATA,
+        contract_data=LedgerKeyContractData(Address(contract).to_xdr_sc_address(), key, durability),
+    )
+
+
+def nonce_key(user: str, nonce: int) -> LedgerKey:
+    return LedgerKey(
+        type=LedgerEntryType.CONTRACT_DATA,
+        contract_data=LedgerKeyContractData(
+            Address(user).to_xdr_sc_address(),
+            SCVal(SCValType.SCV_LEDGER_KEY_NONCE, nonce_key=SCNonceKey(Int64(nonce))),
+            ContractDataDurability.TEMPORARY,
+        ),
+    )
+
+
+def simulation(auth=(), read_write=()) -> SimulateTransactionResponse:
+    data = SorobanTransactionData(
+        ext=ExtensionPoint(0),
+        resources=SorobanResources(LedgerFootprint([], list(read_write)), Uint32(1000), Uint32(0), Uint32(0)),
+        resource_fee=Int64(1000),
+    )
+    return SimulateTransactionResponse.model_validate({
+        "transactionData": data.to_xdr(),
+        "minResourceFee": 1000,
+        "results": [{"auth": [entry.to_xdr() for entry in auth], "xdr": "AAAAAQ=="}],
+        "latestLedger": 10,
+    })
+
+
+def test_contract_call_rejects_simulated_source_account_auth():
+    server, attacker = Keypair.random(), Keypair.random()
+    executor = SorobanAuthExecutor(server.secret)
+    rpc = FakeRpc(executor, simulation([source_account_transfer_auth(attacker.public_key)]))
+
+    result = asyncio.run(executor.execute_contract_call_with_auth(
+        attacker.public_key,
+        TOKEN,
+        "transfer",
+        [
+            {"type": "address", "value": server.public_key},
+            {"type": "address", "value": attacker.public_key},
+            {"type": "i128", "value": 10**7},
+        ],
+        [],
+    ))
+
+    assert result["code"] == "rejected_envelope"
+    assert rpc.sent == []
+
+
+def test_contract_call_rejects_client_source_account_auth():
+    server, attacker = Keypair.random(), Keypair.random()
+    executor = SorobanAuthExecutor(server.secret)
+    rpc = FakeRpc(executor, simulation())
+
+    result = asyncio.run(executor.execute_contract_call_with_auth(
+        attacker.public_key, TOKEN, "transfer", [], [source_account_transfer_auth(attacker.public_key).to_xdr()]
+    ))
+
+    assert result["code"] == "rejected_envelope"
+    assert rpc.simulations == 0
+    assert rpc.sent == []
+
+
+def test_contract_call_without_server_auth_is_signed_and_sent():
+    server, user = Keypair.random(), Keypair.random()
+    executor = SorobanAuthExecutor(server.secret)
+    rpc = FakeRpc(executor, simulation())
+
+    result = asyncio.run(executor.execute_contract_call_with_auth(user.public_key, TOKEN, "decimals", [], []))
+
+    assert result["status"] == "success"
+    [sent] = rpc.sent
+    assert sent.transaction.source.account_id == server.public_key
+    assert sent.transaction.sequence == 101
+    assert len(sent.signatures) == 1
+
+
+def test_cached_simulation_is_reused_with_the_new_nonce():
+    server, user, to = Keypair.random(), Keypair.random(), Keypair.random()
+    executor = SorobanAuthExecutor(server.secret)
+    balance = contract_data_key(TOKEN, Address(user.public_key).to_xdr_sc_val())
+    rpc = FakeRpc(executor, simulation(read_write=[balance, nonce_key(user.public_key, 1)]))
+    args = [
+        {"type": "address", "value": user.public_key},
+        {"type": "address", "value": to.public_key},
+        {"type": "i128", "value": 5},
+    ]
+
+    async def two_calls():
+        for nonce in (1, 2):
+            auth = [user_transfer_auth(user.public_key, to.public_key, nonce).to_xdr()]
+            result = await executor.execute_contract_call_with_auth(user.public_key, TOKEN, "transfer", args, auth)
+            assert result["status"] == "success"
+
+    asyncio.run(two_calls())
+
+    assert rpc.simulations == 1
+    first, second = (envelope.transaction.soroban_data.resources.footprint.read_write for envelope in rpc.sent)
+    assert first == [balance, nonce_key(user.public_key, 1)]
+    assert second == [balance, nonce_key(user.public_key, 2)]
+
+
+def test_bare_strings_become_addresses_or_symbols():
+    user = Keypair.random().public_key
+
+    assert _to_scval("withdraw") == SCVal(SCValType.SCV_SYMBOL, sym=SCSymbol(b"withdraw"))
+    assert _to_scval(user) == Address(user).to_xdr_sc_val()
+    assert _to_scval(TOKEN) == Address(TOKEN).to_xdr_sc_val()
+    with pytest.raises(ValueError, match="Invalid address format"):
+        _to_scval(TOKEN[:-1] + "A")
+
+
+def test_encoded_scvals_go_through_the_xdr_type():
+    encoded = Address(TOKEN).to_xdr_sc_val()
+
+    assert _to_scval({"type": "xdr", "value": encoded.to_xdr()}) == encoded
+
+
+def transfer_envelope(source: str, auth: SorobanAuthorizationEntry, *, fee: int = 10_000) -> str:
+    return (
+        TransactionBuilder(Account(source, 7), Network.TESTNET_NETWORK_PASSPHRASE, base_fee=fee)
+        .append_invoke_contract_function_op(TOKEN, "transfer", [], auth=[auth])
+        .set_timeout(30)
+        .build()
+        .to_xdr()
+    )
+
+
+def test_server_sourced_transfer_with_source_account_auth_is_rejected():
+    server, attacker = Keypair.random(), Keypair.random()
+    executor = SorobanAuthExecutor(server.secret)
+    rpc = FakeRpc(executor)
+    envelope = transfer_envelope(server.public_key, source_account_transfer_auth(attacker.public_key))
+
+    result = asyncio.run(executor.execute_with_authorization(envelope, attacker.public_key))
+
+    assert result["code"] == "rejected_envelope"
+    assert rpc.sent == []
+
+
+def test_user_sourced_envelope_with_source_account_auth_is_rejected():
+    server, user = Keypair.random(), Keypair.random()
+    executor = SorobanAuthExecutor(server.secret)
+    rpc = FakeRpc(executor)
+    envelope = transfer_envelope(user.public_key, source_account_transfer_auth(server.public_key))
+
+    result = asyncio.run(executor.execute_with_authorization(envelope, user.public_key))
+
+    assert result["code"] == "rejected_envelope"
+    assert rpc.sent == []
+
+
+def test_user_envelope_is_taken_over_and_signed_once_by_the_server():
+    server, user, to = Keypair.random(), Keypair.random(), Keypair.random()
+    executor = SorobanAuthExecutor(server.secret)
+    rpc = FakeRpc(executor)
+    envelope = transfer_envelope(user.public_key, user_transfer_auth(user.public_key, to.public_key, 3))
+
+    result = asyncio.run(executor.execute_with_authorization(envelope, user.public_key))
+
+    assert result["status"] == "success"
+    [sent] = rpc.sent
+    assert sent.transaction.source.account_id == server.public_key
+    assert sent.transaction.sequence == 101
+    [signature] = sent.signatures
+    server.verify(sent.hash(), signature.signature)
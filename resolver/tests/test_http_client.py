@@ -0,0 +1,48 @@
+import asyncio
+
+import httpx
+import pytest
+from stellar_sdk.exceptions import StreamClientError
+
+from resolver.http_client import HttpxClient
+
+SSE = {"content-type": "text/event-stream; charset=utf-8"}
+
+
+def client_for(handler) -> HttpxClient:
+    client = HttpxClient()
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+async def take(stream, n):
+    records = []
+    async for record in stream:
+        records.append(record)
+        if len(records) == n:
+            break
+    return records
+
+
+def test_stream_yields_records_and_resumes_from_last_id():
+    cursors = []
+
+    def handler(request):
+        cursors.append(request.url.params.get("cursor"))
+        body = b'retry: 1\ndata: "hello"\n\n: keep-alive\n\nid: 42\ndata: {"sequence":\ndata: 7}\n\n'
+        return httpx.Response(200, content=body, headers=SSE)
+
+    client = client_for(handler)
+    records = asyncio.run(take(client.stream("https://horizon.test/ledgers", {"cursor": "now"}), 2))
+
+    assert records == [{"sequence": 7}, {"sequence": 7}]
+    assert cursors == ["now", "42"]
+
+
+def test_stream_raises_on_error_response():
+    def handler(request):
+        return httpx.Response(404, json={"title": "Resource Missing"})
+
+    client = client_for(handler)
+    with pytest.raises(StreamClientError):
+        asyncio.run(take(client.stream("https://horizon.test/nope"), 1))
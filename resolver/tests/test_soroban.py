@@ -0,0 +1,23 @@
+import pytest
+from stellar_sdk import Address, Keypair
+from stellar_sdk.xdr import SCVal
+
+from resolver.soroban import address_to_scval, sc_address_from_str
+
+CONTRACT = "CDLZFC3SYJYDZT7K67VZ75HPJVIEUVNIXF47ZG2FB2RMQQVU2HHGCYSC"
+
+
+@pytest.mark.parametrize("address", [Keypair.random().public_key, CONTRACT])
+def test_address_scval_round_trips_through_xdr(address):
+    scval = address_to_scval(address)
+    decoded = SCVal.from_xdr(scval.to_xdr())
+
+    assert decoded == scval
+    assert Address.from_xdr_sc_address(decoded.address).address == address
+    assert scval.to_xdr() == Address(address).to_xdr_sc_val().to_xdr()
+
+
+@pytest.mark.parametrize("address", ["", "hello", CONTRACT[:-1] + "A", "S" + CONTRACT[1:]])
+def test_invalid_addresses_are_rejected(address):
+    with pytest.raises(ValueError, match="Invalid address format"):
+        sc_address_from_str(address)